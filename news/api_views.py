@@ -0,0 +1,221 @@
+"""
+JSON API только для чтения: лента, новость и страницы комментариев.
+
+Строки берутся из .values(), объекты моделей не создаются.
+Параметры запроса:
+
+- fields=id,title - вернуть только перечисленные поля;
+- format=rows - компактная форма: список полей один раз
+  и строки-массивы вместо словарей;
+- after - курсор следующей страницы (лента и комментарии).
+
+JSON кодируется без пробелов. Ответ длиннее API_GZIP_MIN_LENGTH
+сжимается gzip, если клиент это принимает. ETag и Last-Modified
+считаются до выборки данных (для ленты - по той же выборке), так что
+ответ 304 не сериализует ничего.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.views import generic
+
+from .conditional import (
+    conditional_response, make_etag, news_state, rows_state
+)
+from .models import Comment, News
+from .pagination import InvalidCursor, keyset_page
+from .views import ARCHIVE_ORDERING, COMMENTS_ORDERING
+
+# Имя поля в ответе -> путь в values().
+NEWS_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'date': 'date',
+    'summary': 'summary',
+    'text': 'text',
+    'comment_count': 'comment_count',
+    'updated_at': 'updated_at',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+    'updated_at': 'updated_at',
+}
+FEED_DEFAULT_FIELDS = ('id', 'title', 'date', 'summary', 'comment_count')
+FORMATS = ('objects', 'rows')
+
+
+def parse_fields(request, allowed, default):
+    """Поля из параметра fields в порядке запроса, без повторов."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in allowed]
+    if not fields or unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def lookups(fields, columns, extra=()):
+    """Пути для values(): выбранные поля и служебные extra."""
+    return list(dict.fromkeys(
+        [columns[name] for name in fields] + list(extra)
+    ))
+
+
+def encode(payload):
+    return json.dumps(
+        payload,
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
+
+
+class ApiView(generic.View):
+    """
+    Общая часть представлений API.
+
+    Ошибки в параметрах превращаются в ответ 400 с описанием в JSON.
+    """
+    columns = NEWS_FIELDS
+    default_fields = tuple(NEWS_FIELDS)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.fields = parse_fields(
+                request, self.columns, self.default_fields
+            )
+            self.format = request.GET.get('format', 'objects')
+            if self.format not in FORMATS:
+                raise BadRequest(f'Неизвестный формат: {self.format}.')
+            return super().dispatch(request, *args, **kwargs)
+        except InvalidCursor:
+            return JsonResponse({'error': 'Некорректный курсор.'}, status=400)
+        except BadRequest as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+    def project(self, row):
+        return [row[self.columns[name]] for name in self.fields]
+
+    def page_payload(self, rows, next_cursor):
+        """Страница строк в выбранном формате."""
+        if self.format == 'rows':
+            return {
+                'fields': self.fields,
+                'rows': [self.project(row) for row in rows],
+                'next': next_cursor,
+            }
+        return {
+            'results': [
+                dict(zip(self.fields, self.project(row))) for row in rows
+            ],
+            'next': next_cursor,
+        }
+
+    def respond(self, state, last_modified, build):
+        """
+        Ответ 304 или JSON из build(), при возможности сжатый.
+
+        ETag зависит от состояния данных, параметров запроса и того,
+        сжимается ли ответ.
+        """
+        request = self.request
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        gzip = bool(re_accepts_gzip.search(accept))
+        etag = make_etag(state, request.get_full_path(), gzip)
+
+        def render():
+            content = encode(build())
+            response = HttpResponse(
+                content, content_type='application/json'
+            )
+            if gzip and len(content) >= settings.API_GZIP_MIN_LENGTH:
+                response.content = compress_string(content)
+                response['Content-Encoding'] = 'gzip'
+            return response
+
+        response = conditional_response(request, etag, last_modified, render)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class NewsFeedApi(ApiView):
+    """Лента новостей, свежие первыми, по страницам."""
+    default_fields = FEED_DEFAULT_FIELDS
+
+    def get(self, request):
+        rows, next_cursor = keyset_page(
+            News.objects.values(*lookups(
+                self.fields, self.columns, ('date', 'id', 'updated_at')
+            )),
+            ARCHIVE_ORDERING,
+            settings.API_PAGE_SIZE,
+            request.GET.get('after'),
+        )
+        state, last_modified = rows_state(
+            (row['id'], row['updated_at']) for row in rows
+        )
+        return self.respond(
+            state, last_modified,
+            lambda: self.page_payload(rows, next_cursor),
+        )
+
+
+class NewsDetailApi(ApiView):
+    """Одна новость."""
+
+    def get(self, request, pk):
+        state, last_modified = news_state(pk)
+        if state is None:
+            raise Http404
+
+        def build():
+            row = News.objects.values(
+                *lookups(self.fields, self.columns)
+            ).get(pk=pk)
+            if self.format == 'rows':
+                return {'fields': self.fields, 'row': self.project(row)}
+            return dict(zip(self.fields, self.project(row)))
+
+        return self.respond(state, last_modified, build)
+
+
+class NewsCommentsApi(ApiView):
+    """
+    Комментарии к новости по страницам, старые первыми.
+
+    Любое изменение комментариев сдвигает время изменения новости,
+    поэтому ETag всех страниц считается по одной строке новости.
+    """
+    columns = COMMENT_FIELDS
+    default_fields = tuple(COMMENT_FIELDS)
+
+    def get(self, request, pk):
+        state, last_modified = news_state(pk)
+        if state is None:
+            raise Http404
+
+        def build():
+            rows, next_cursor = keyset_page(
+                Comment.objects.filter(news_id=pk).values(*lookups(
+                    self.fields, self.columns, ('created', 'id')
+                )),
+                COMMENTS_ORDERING,
+                settings.COMMENTS_PAGE_SIZE,
+                request.GET.get('after'),
+            )
+            return self.page_payload(rows, next_cursor)
+
+        return self.respond(state, last_modified, build)
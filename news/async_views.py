@@ -0,0 +1,154 @@
+"""
+Асинхронные версии страниц для чтения.
+
+Под ASGI синхронное представление целиком уходит в пул потоков.
+Здесь в поток уходит только работа с базой: через асинхронный ORM,
+если он есть в установленной версии Django, иначе одним вызовом
+sync_to_async на все запросы страницы.
+Включаются настройкой NEWS_ASYNC_VIEWS.
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from django.template.response import TemplateResponse
+
+from yanews.routers import read_from_primary
+
+from .cache import get_feed_page, get_feed_version, set_feed_page
+from .conditional import (
+    conditional_response, make_etag, news_state, not_modified, rows_state,
+    set_validators,
+)
+from .forms import CommentForm
+from .models import News
+from .pagination import keyset_queryset, split_page
+from .views import (
+    COMMENTS_ORDERING, NewsComment, get_comments, patch_detail_cache_control,
+    skip_session,
+)
+
+ASYNC_ORM = hasattr(QuerySet, '__aiter__')
+
+
+def _fetch_sync(querysets):
+    return [list(queryset) for queryset in querysets]
+
+
+async def fetch(*querysets):
+    """Выполняет запросы и возвращает списки объектов."""
+    if not ASYNC_ORM:
+        return await sync_to_async(_fetch_sync)(querysets)
+    results = []
+    for queryset in querysets:
+        results.append([obj async for obj in queryset])
+    return results
+
+
+def _resolve_user(request):
+    """Загружает пользователя, пока мы ещё в синхронном контексте."""
+    return request.user.is_authenticated
+
+
+def _cached_feed():
+    version = get_feed_version()
+    return version, get_feed_page(version)
+
+
+async def news_list(request):
+    """
+    Асинхронный аналог NewsList.
+
+    ETag считается по уже загруженным новостям, без отдельного запроса.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+    is_authenticated = await sync_to_async(_resolve_user)(request)
+    if not is_authenticated:
+        version, page = await sync_to_async(_cached_feed)()
+        if page is not None:
+            return conditional_response(
+                request, page['etag'], page['last_modified'],
+                partial(HttpResponse, page['content']),
+            )
+    feed = News.objects.feed()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    if is_authenticated:
+        news_feed, = await fetch(feed)
+    else:
+        # Лента уйдёт в кеш: читаем её из основной базы, а не с реплики.
+        with read_from_primary():
+            news_feed, = await fetch(feed)
+    etag, last_modified = rows_state(
+        (news.pk, news.updated_at) for news in news_feed
+    )
+    if is_authenticated:
+        etag = make_etag(etag, request.user.pk)
+    response = conditional_response(
+        request, etag, last_modified,
+        partial(TemplateResponse, request, 'news/home.html', {
+            'object_list': news_feed,
+            'news_feed': news_feed,
+        }),
+    )
+    if not is_authenticated and hasattr(
+        response, 'add_post_render_callback'
+    ):
+        response.add_post_render_callback(
+            lambda rendered: set_feed_page(version, {
+                'content': rendered.content,
+                'etag': etag,
+                'last_modified': last_modified,
+            })
+        )
+    return response
+
+
+async def news_detail(request, pk):
+    """
+    Асинхронный аналог NewsDetailView.
+
+    Как и синхронная версия, сначала проверяет ETag и отвечает 304,
+    не загружая новость и комментарии.
+    Комментарий по-прежнему сохраняет синхронный NewsComment:
+    запись в базу всё равно не может идти параллельно.
+    """
+    if request.method == 'POST':
+        return await sync_to_async(NewsComment.as_view())(request, pk=pk)
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD', 'POST'))
+    anonymous = skip_session(request)
+    is_authenticated = not anonymous and await sync_to_async(
+        _resolve_user
+    )(request)
+    etag, last_modified = await sync_to_async(news_state)(pk)
+    if etag is None:
+        raise Http404
+    etag = make_etag(etag, request.user.pk)
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        news, comments = await fetch(
+            News.objects.filter(pk=pk),
+            keyset_queryset(
+                get_comments(pk), COMMENTS_ORDERING,
+                settings.COMMENTS_PAGE_SIZE,
+            ),
+        )
+        if not news:
+            raise Http404
+        comments, next_cursor = split_page(
+            comments, COMMENTS_ORDERING, settings.COMMENTS_PAGE_SIZE
+        )
+        context = {
+            'object': news[0],
+            'news': news[0],
+            'comments': comments,
+            'next_cursor': next_cursor,
+        }
+        if is_authenticated:
+            context['form'] = CommentForm()
+        response = TemplateResponse(request, 'news/detail.html', context)
+        set_validators(request, response, etag, last_modified)
+    patch_detail_cache_control(response, anonymous)
+    return response
@@ -0,0 +1,8 @@
+"""
+Инструменты для нагрузочных замеров.
+
+Генерация синтетических данных через bulk_create и прогон сценариев
+через тестовый клиент с подсчётом задержек, SQL-запросов и памяти.
+Модули разделены по областям замеров: data - синтетические данные,
+timing - общие замеры, views, api, render, transfer и load - сценарии.
+"""
@@ -0,0 +1,40 @@
+"""Сравнение JSON API с HTML-страницами."""
+from django.test import Client
+from django.urls import reverse
+
+from ..models import News
+from .timing import measure
+
+
+def run_api_benchmarks(repeat):
+    """
+    Сравнивает JSON API с HTML-страницами на тех же данных.
+
+    Для каждой пары замеряются задержки и размер ответа без сжатия
+    и с gzip. Данные должны быть уже сгенерированы generate_dataset().
+    """
+    news = News.objects.order_by('-comment_count').first()
+    client = Client()
+    pairs = {
+        'feed': (
+            reverse('news:home'), reverse('news:api_feed'),
+        ),
+        'detail': (
+            reverse('news:detail', args=(news.pk,)),
+            reverse('news:api_detail', args=(news.pk,)),
+        ),
+        'comments': (
+            reverse('news:comments', args=(news.pk,)),
+            reverse('news:api_comments', args=(news.pk,)) + '?format=rows',
+        ),
+    }
+    results = {}
+    for name, urls in pairs.items():
+        for kind, url in zip(('html', 'api'), urls):
+            result = measure(lambda _: client.get(url), repeat)
+            result['bytes'] = len(client.get(url).content)
+            result['gzip_bytes'] = len(
+                client.get(url, HTTP_ACCEPT_ENCODING='gzip').content
+            )
+            results[f'{name}_{kind}'] = result
+    return results
@@ -0,0 +1,58 @@
+"""Синтетические данные для замеров."""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from ..models import Comment, News
+
+User = get_user_model()
+
+
+def generate_dataset(news_count, comments_count, users_count=10,
+                     batch_size=5000):
+    """
+    Заполняет базу синтетическими новостями и комментариями.
+
+    Комментарии распределяются по новостям случайно, время их
+    создания растёт, как в реальной ленте. Новость выбирается из
+    диапазона первичных ключей, а не из списка всех id, поэтому
+    память не зависит от числа новостей; база для замеров заполняется
+    с нуля, и ключи в ней идут подряд. Генератор случайных чисел
+    с фиксированным зерном делает прогоны воспроизводимыми.
+    Комментариям нужен автор, поэтому создаётся хотя бы один
+    пользователь. Возвращает список созданных пользователей.
+    """
+    User.objects.bulk_create([
+        User(username=f'bench-user-{index}')
+        for index in range(max(users_count, 1))
+    ])
+    users = list(User.objects.filter(username__startswith='bench-user-'))
+    today = timezone.now().date()
+    for start in range(0, news_count, batch_size):
+        News.objects.bulk_create([
+            News(
+                title=f'Новость {index}',
+                text=f'Текст синтетической новости номер {index}. ' * 5,
+                date=today - timedelta(days=index % 3650),
+            )
+            for index in range(start, min(start + batch_size, news_count))
+        ])
+    bounds = News.objects.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return users
+    rng = random.Random(0)
+    now = timezone.now()
+    for start in range(0, comments_count, batch_size):
+        Comment.objects.bulk_create([
+            Comment(
+                news_id=rng.randint(bounds['first'], bounds['last']),
+                author=users[index % len(users)],
+                text=f'Комментарий {index}',
+                created=now + timedelta(seconds=index),
+            )
+            for index in range(start, min(start + batch_size, comments_count))
+        ])
+    return users
@@ -0,0 +1,82 @@
+"""Нагрузочные прогоны в духе WSGI и ASGI."""
+import asyncio
+import threading
+import time
+
+from django.db import connection
+from django.test import AsyncClient, Client
+
+from .timing import percentile
+
+
+def summarize_load(timings, elapsed):
+    """Сводка нагрузочного прогона: пропускная способность и задержки."""
+    return {
+        'requests': len(timings),
+        'seconds': elapsed,
+        'rps': len(timings) / elapsed,
+        'p50_ms': percentile(timings, 0.5),
+        'p99_ms': percentile(timings, 0.99),
+    }
+
+
+def run_threaded_load(url, user, requests, concurrency):
+    """
+    Нагрузка в духе WSGI: concurrency потоков с синхронным клиентом.
+
+    Каждый поток выполняет свою долю запросов и закрывает
+    своё соединение с базой. Клиенты логинятся заранее, чтобы
+    запись сессий не мешала замеру.
+    """
+    timings = []
+    lock = threading.Lock()
+
+    def worker(client, count):
+        local = []
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get(url)
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            timings.extend(local)
+        connection.close()
+
+    shares = [
+        requests // concurrency + (index < requests % concurrency)
+        for index in range(concurrency)
+    ]
+    threads = []
+    for share in shares:
+        client = Client()
+        client.force_login(user)
+        threads.append(threading.Thread(target=worker, args=(client, share)))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize_load(timings, time.perf_counter() - started)
+
+
+def run_async_load(url, user, requests, concurrency):
+    """
+    Нагрузка в духе ASGI: concurrency одновременных запросов
+    асинхронного клиента в одном цикле событий.
+    """
+    client = AsyncClient()
+    client.force_login(user)
+    timings = []
+
+    async def one(semaphore):
+        async with semaphore:
+            started = time.perf_counter()
+            await client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(semaphore) for _ in range(requests)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return summarize_load(timings, time.perf_counter() - started)
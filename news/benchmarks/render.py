@@ -0,0 +1,105 @@
+"""Замеры отрисовки шаблонов без представлений и базы."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from ..forms import CommentForm
+from ..models import Comment, News
+from ..views import get_comments
+from .timing import measure
+
+User = get_user_model()
+
+
+def template_backend(cached):
+    """Движок шаблонов проекта с cached loader или без него."""
+    config = settings.TEMPLATES[0]
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    return DjangoTemplates({
+        'NAME': 'cached' if cached else 'plain',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**config['OPTIONS'], 'loaders': loaders},
+    })
+
+
+def run_render_benchmarks(comments_count, repeat):
+    """
+    Замеряет отрисовку страницы новости со всеми comments_count
+    комментариями, без представления и запросов к базе.
+
+    Страницу смотрит автор всех комментариев, так что у каждого
+    выводятся ссылки на правку и удаление. Сравниваются загрузчики
+    шаблонов, холодный и тёплый кеш фрагментов и построение ссылок
+    тегом {% url %} и тегом {% pk_url %}.
+    """
+    user = User.objects.create(username='bench-render-author')
+    news = News.objects.create(title='Новость', text='Текст новости. ' * 50)
+    now = timezone.now()
+    Comment.objects.bulk_create([
+        Comment(
+            news=news,
+            author=user,
+            text=f'Комментарий {index}\nвторая строка',
+            created=now + timedelta(seconds=index),
+        )
+        for index in range(comments_count)
+    ])
+    news.refresh_from_db()
+    comments = list(get_comments(news.pk))
+    request = RequestFactory().get(reverse('news:detail', args=(news.pk,)))
+    request.user = user
+    context = {
+        'object': news,
+        'news': news,
+        'comments': comments,
+        'next_cursor': None,
+        'form': CommentForm(),
+    }
+    plain = template_backend(cached=False)
+    cached = template_backend(cached=True)
+    fragments = caches['template_fragments']
+
+    def render(backend):
+        return backend.get_template('news/detail.html').render(
+            context, request
+        )
+
+    pks = [comment.pk for comment in comments]
+    links = {
+        name: cached.from_string(
+            '{% load news_urls %}{% for pk in pks %}' + tag + '{% endfor %}'
+        )
+        for name, tag in (
+            ('links_url_tag',
+             "{% url 'news:edit' pk %}{% url 'news:delete' pk %}"),
+            ('links_pk_url',
+             "{% pk_url 'news:edit' pk %}{% pk_url 'news:delete' pk %}"),
+        )
+    }
+    render(cached)
+    results = {
+        'detail_plain_loader': measure(
+            lambda _: render(plain), repeat, setup=fragments.clear
+        ),
+        'detail_cached_loader': measure(
+            lambda _: render(cached), repeat, setup=fragments.clear
+        ),
+        'detail_warm_fragments': measure(lambda _: render(cached), repeat),
+    }
+    for name, template in links.items():
+        results[name] = measure(
+            lambda _: template.render({'pks': pks}), repeat
+        )
+    return results
@@ -0,0 +1,51 @@
+"""Общие замеры: задержки, число SQL-запросов и пиковая память."""
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, share):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(share * len(ordered)) - 1)
+    return ordered[index]
+
+
+def measure(action, repeat, setup=None):
+    """
+    Выполняет action repeat раз и возвращает сводку замеров.
+
+    setup, если передан, вызывается перед каждым повтором вне замера,
+    его результат передаётся в action. Пиковая память измеряется
+    отдельным прогоном под tracemalloc, чтобы не искажать задержки.
+    """
+    setup = setup or (lambda: None)
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        argument = setup()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            action(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(context.captured_queries))
+    argument = setup()
+    tracemalloc.start()
+    try:
+        action(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'repeat': repeat,
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': percentile(timings, 0.5),
+        'p90_ms': percentile(timings, 0.9),
+        'p99_ms': percentile(timings, 0.99),
+        'max_ms': max(timings),
+        'queries': max(queries),
+        'peak_memory_kb': peak / 1024,
+    }
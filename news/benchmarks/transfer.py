@@ -0,0 +1,61 @@
+"""Объём данных, которые уходят клиенту вместе со статикой."""
+import re
+
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+
+from ..models import News
+
+
+def response_size(client, url, compressed):
+    """Размер тела ответа в байтах и само тело."""
+    headers = {'HTTP_ACCEPT_ENCODING': 'gzip'} if compressed else {}
+    response = client.get(url, **headers)
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    return len(content), content
+
+
+def run_transfer_benchmarks():
+    """
+    Считает байты, которые уходят клиенту за главную страницу и
+    страницу новости вместе с локальной статикой: без сжатия и
+    со сжатием HTML и заранее сжатой статикой.
+
+    Статика должна быть собрана collectstatic и отдаваться
+    приложением (STATIC_SERVE). Сторонние ресурсы (CDN) не считаются.
+    """
+    news = News.objects.order_by('-comment_count').first()
+    asset_pattern = re.compile(
+        r'(?:href|src)="(' + re.escape(settings.STATIC_URL) + r'[^"]+)"'
+    )
+    client = Client()
+    results = {}
+    for name, url in (
+        ('home', reverse('news:home')),
+        ('detail', reverse('news:detail', args=(news.pk,))),
+    ):
+        html, content = response_size(client, url, compressed=False)
+        html_gzip, _ = response_size(client, url, compressed=True)
+        assets = asset_pattern.findall(content.decode())
+        assets_plain = sum(
+            response_size(client, asset, compressed=False)[0]
+            for asset in assets
+        )
+        assets_gzip = sum(
+            response_size(client, asset, compressed=True)[0]
+            for asset in assets
+        )
+        results[name] = {
+            'html_bytes': html,
+            'html_gzip_bytes': html_gzip,
+            'assets': len(assets),
+            'assets_bytes': assets_plain,
+            'assets_gzip_bytes': assets_gzip,
+            'total_bytes': html + assets_plain,
+            'total_gzip_bytes': html_gzip + assets_gzip,
+        }
+    return results
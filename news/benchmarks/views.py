@@ -0,0 +1,63 @@
+"""Замеры основных страниц и действий с комментариями."""
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from ..models import Comment, News
+from .timing import measure
+
+User = get_user_model()
+
+
+@override_settings(COMMENT_THROTTLE_BURST=0)
+def run_view_benchmarks(repeat):
+    """
+    Прогоняет основные сценарии через тестовый клиент.
+
+    Данные должны быть уже сгенерированы generate_dataset().
+    Ограничение частоты комментариев на время замеров отключено.
+    """
+    news = News.objects.order_by('-comment_count').first()
+    user = User.objects.filter(username__startswith='bench-user-').first()
+    anonymous = Client()
+    author = Client()
+    author.force_login(user)
+    detail_url = reverse('news:detail', args=(news.pk,))
+
+    def new_comment():
+        return Comment.objects.create(news=news, author=user, text='Текст')
+
+    return {
+        'home_anonymous': measure(
+            lambda _: anonymous.get(reverse('news:home')), repeat
+        ),
+        'home_authenticated': measure(
+            lambda _: author.get(reverse('news:home')), repeat
+        ),
+        'detail_anonymous': measure(
+            lambda _: anonymous.get(detail_url), repeat
+        ),
+        'detail_authenticated': measure(
+            lambda _: author.get(detail_url), repeat
+        ),
+        'comment_create': measure(
+            lambda _: author.post(detail_url, {'text': 'Новый комментарий'}),
+            repeat,
+        ),
+        'comment_update': measure(
+            lambda comment: author.post(
+                reverse('news:edit', args=(comment.pk,)),
+                {'text': 'Исправленный комментарий'},
+            ),
+            repeat,
+            setup=new_comment,
+        ),
+        'comment_delete': measure(
+            lambda comment: author.post(
+                reverse('news:delete', args=(comment.pk,))
+            ),
+            repeat,
+            setup=new_comment,
+        ),
+    }
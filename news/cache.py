@@ -0,0 +1,59 @@
+"""
+Версионированный кеш ленты новостей.
+
+Любое изменение новости или комментария увеличивает версию ленты,
+поэтому закешированные ранее страницы просто перестают запрашиваться
+и со временем вытесняются из кеша.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+FEED_VERSION_KEY = 'news:feed:version'
+FEED_PAGE_KEY = 'news:feed:page:{version}'
+
+
+def get_cache():
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+def get_feed_version():
+    """
+    Возвращает текущую версию ленты.
+
+    Если версия вытеснена из кеша, начинаем отсчёт заново с текущего
+    времени, чтобы не совпасть ни с одной из уже выданных версий.
+    """
+    cache = get_cache()
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """Делает недействительными все закешированные страницы ленты."""
+    cache = get_cache()
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_feed_page(version):
+    """
+    Закешированная страница ленты или None.
+
+    Страница - словарь с ключами content, etag и last_modified.
+    """
+    return get_cache().get(FEED_PAGE_KEY.format(version=version))
+
+
+def set_feed_page(version, page):
+    get_cache().set(
+        FEED_PAGE_KEY.format(version=version),
+        page,
+        settings.FEED_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,132 @@
+"""
+Отложенная запись комментариев.
+
+В режиме COMMENT_WRITE_QUEUE представление не сохраняет комментарий
+само, а кладёт его в очередь процесса. Фоновый поток раз в
+COMMENT_QUEUE_INTERVAL секунд или по накоплении COMMENT_QUEUE_BATCH_SIZE
+комментариев записывает их через bulk_create() небольшими транзакциями.
+Единственному писателю SQLite так достаётся одна короткая транзакция
+на пачку вместо транзакции на каждый комментарий.
+
+Комментарии появляются на странице с задержкой до одного интервала;
+при аварийной остановке процесса ещё не записанные теряются.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+
+class CommentWriteQueue:
+
+    def __init__(self, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._items = []
+        self._lock = threading.Lock()
+        # Одна запись за раз: flush() возвращается, только когда
+        # записана и пачка, которую в этот момент пишет фоновый поток.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, comment):
+        """Ставит несохранённый комментарий в очередь на запись."""
+        with self._lock:
+            self._items.append(comment)
+            full = len(self._items) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Записывает все накопленные комментарии и возвращает их число.
+
+        Если база занята или недоступна, незаписанные комментарии
+        возвращаются в начало очереди, а ошибка пробрасывается дальше.
+        """
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                items, self._items = self._items, []
+            for start in range(0, len(items), self.batch_size):
+                try:
+                    written += self._write(
+                        items[start:start + self.batch_size]
+                    )
+                except OperationalError:
+                    with self._lock:
+                        self._items[:0] = items[start:]
+                    raise
+        return written
+
+    def _write(self, batch):
+        """
+        Записывает пачку и возвращает число записанных комментариев.
+
+        Если пачку отвергла база (например, новость успели удалить),
+        комментарии пишутся по одному, а не прошедшие проверку
+        попадают в лог и отбрасываются: повтор их не исправит.
+        """
+        try:
+            Comment.objects.bulk_create(batch)
+            return len(batch)
+        except OperationalError:
+            raise
+        except DatabaseError:
+            if len(batch) > 1:
+                return sum(self._write([comment]) for comment in batch)
+            comment, = batch
+            logger.exception(
+                'Комментарий к новости %s от пользователя %s отброшен: %r',
+                comment.news_id, comment.author_id, comment.text,
+            )
+            return 0
+
+    def start(self):
+        """Запускает фоновую запись; повторный вызов ничего не делает."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='comment-write-queue', daemon=True
+            )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось записать пачку комментариев')
+            finally:
+                connection.close()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_comment_queue():
+    """Очередь записи комментариев этого процесса, уже запущенная."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CommentWriteQueue(
+                settings.COMMENT_QUEUE_BATCH_SIZE,
+                settings.COMMENT_QUEUE_INTERVAL,
+            )
+            _queue.start()
+    return _queue
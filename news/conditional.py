@@ -0,0 +1,93 @@
+"""
+Условные GET-запросы (ETag и Last-Modified).
+
+В отличие от декоратора condition(), ETag и время изменения считаются
+одной функцией, то есть одним запросом к базе, а ответ 304 отдаётся
+до построения контекста и отрисовки шаблона.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import News
+
+
+def make_etag(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def rows_state(rows):
+    """Возвращает ETag и время изменения по парам (id, updated_at)."""
+    rows = list(rows)
+    last_modified = max((updated for _, updated in rows), default=None)
+    return make_etag(rows), last_modified
+
+
+def feed_state(news_count):
+    """
+    Возвращает ETag и время изменения ленты.
+
+    Берём id и время изменения показанных новостей: запрос идёт по
+    индексу (-date, -id) и читает news_count строк. Время изменения
+    новости сдвигается и при изменении её комментариев.
+    """
+    return rows_state(
+        News.objects.values_list('id', 'updated_at')[:news_count]
+    )
+
+
+def news_state(pk):
+    """Возвращает ETag и время изменения новости или (None, None)."""
+    updated = News.objects.filter(pk=pk).values_list(
+        'updated_at', flat=True
+    ).first()
+    if updated is None:
+        return None, None
+    return make_etag(pk, updated), updated
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Возвращает 304 (или 412), если у клиента актуальная версия, иначе None.
+
+    Нужен асинхронным представлениям: они проверяют версию до того,
+    как загрузить данные страницы.
+    """
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag is not None else None,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+    if response is not None:
+        set_validators(request, response, etag, last_modified)
+    return response
+
+
+def set_validators(request, response, etag, last_modified):
+    """Проставляет ETag и Last-Modified в ответ на GET и HEAD."""
+    if request.method not in ('GET', 'HEAD'):
+        return
+    if last_modified is not None and not response.has_header(
+        'Last-Modified'
+    ):
+        response['Last-Modified'] = http_date(
+            int(last_modified.timestamp())
+        )
+    if etag is not None:
+        response.setdefault('ETag', quote_etag(etag))
+
+
+def conditional_response(request, etag, last_modified, get_response):
+    """
+    Отдаёт 304, если у клиента актуальная версия, иначе - get_response().
+
+    В обоих случаях проставляет заголовки ETag и Last-Modified.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = get_response()
+        set_validators(request, response, etag, last_modified)
+    return response
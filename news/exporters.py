@@ -0,0 +1,106 @@
+"""
+Потоковая выгрузка новостей и комментариев.
+
+Строки читаются страницами по id (keyset), каждая страница - через
+iterator(), и сразу кодируются в JSON Lines или CSV, при необходимости
+со сжатием gzip. Ни одна стадия не держит в памяти больше страницы.
+"""
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, News
+
+EXPORT_FIELDS = {
+    'news': ('id', 'title', 'text', 'date', 'comment_count'),
+    'comments': ('id', 'news_id', 'author__username', 'text', 'created'),
+}
+
+
+def get_queryset(kind, date_from=None, date_to=None, since_id=None):
+    """Запрос для выгрузки с фильтрами по дате и по id."""
+    if kind == 'news':
+        queryset = News.objects.all()
+        date_field = 'date'
+    else:
+        queryset = Comment.objects.all()
+        date_field = 'created__date'
+    if date_from:
+        queryset = queryset.filter(**{f'{date_field}__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{date_field}__lte': date_to})
+    if since_id:
+        queryset = queryset.filter(id__gt=since_id)
+    return queryset
+
+
+def iter_rows(queryset, fields, chunk_size=2000):
+    """Отдаёт словари значений, двигаясь по id страницами chunk_size."""
+    last_id = 0
+    while True:
+        page = queryset.filter(id__gt=last_id).order_by('id').values(
+            *fields
+        )[:chunk_size]
+        count = 0
+        for row in page.iterator(chunk_size=chunk_size):
+            count += 1
+            yield row
+        if count < chunk_size:
+            return
+        last_id = row['id']
+
+
+def encode_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield '\n'
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: write() возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def gzip_chunks(chunks, level=6, flush_size=64 * 1024):
+    """
+    Сжимает поток строк в формат gzip.
+
+    Мелкие строки копятся до flush_size, чтобы не сжимать
+    каждую по отдельности.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= flush_size:
+            compressed = compressor.compress(b''.join(buffer))
+            buffer, size = [], 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
+
+
+def export(kind, export_format='jsonl', compress=True, chunk_size=2000,
+           **filters):
+    """Поток байтов (gzip) или строк с выгрузкой."""
+    fields = EXPORT_FIELDS[kind]
+    rows = iter_rows(get_queryset(kind, **filters), fields, chunk_size)
+    if export_format == 'csv':
+        chunks = encode_csv(rows, fields)
+    else:
+        chunks = encode_jsonl(rows)
+    return gzip_chunks(chunks) if compress else chunks
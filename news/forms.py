@@ -1,7 +1,9 @@
+from django import forms
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .profanity import get_matcher
 
 BAD_WORDS = (
     'редиска',
@@ -20,8 +22,19 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if get_matcher(BAD_WORDS).search(text):
+            raise ValidationError(WARNING)
         return text
+
+
+class ExportForm(forms.Form):
+    """Параметры выгрузки новостей или комментариев."""
+    kind = forms.ChoiceField(choices=(
+        ('news', 'Новости'), ('comments', 'Комментарии')
+    ))
+    format = forms.ChoiceField(
+        choices=(('jsonl', 'JSON Lines'), ('csv', 'CSV')), required=False
+    )
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    since_id = forms.IntegerField(required=False, min_value=0)
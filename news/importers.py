@@ -0,0 +1,100 @@
+"""
+Потоковое чтение выгрузок новостей.
+
+Каждый читатель отдаёт записи по одной, не загружая файл целиком,
+поэтому расход памяти не зависит от размера выгрузки.
+"""
+import csv
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+# Один элемент выгрузки не должен занимать память без ограничений.
+MAX_ITEM_SIZE = 16 * 1024 * 1024
+# Пробелы и запятые между элементами массива.
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+class ImportFormatError(ValueError):
+    """Файл не удаётся разобрать."""
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE,
+                    max_item_size=MAX_ITEM_SIZE):
+    """
+    Читает JSON-массив объектов по одному элементу.
+
+    Поддерживает и формат фикстур Django (model/fields),
+    и массив простых объектов. Разобранные элементы не вырезаются
+    из буфера, а пропускаются сдвигом позиции; буфер сжимается только
+    при чтении следующего куска. Элемент длиннее max_item_size
+    символов считается ошибкой формата.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for chunk in iter(lambda: file.read(chunk_size), ''):
+        buffer = chunk.lstrip()
+        if buffer:
+            break
+    if not buffer.startswith('['):
+        raise ImportFormatError('Ожидался JSON-массив.')
+    position = 1
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if len(buffer) - position > max_item_size:
+                raise ImportFormatError(
+                    f'Элемент массива длиннее {max_item_size} символов.'
+                )
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise ImportFormatError('Файл обрывается посреди массива.')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+
+
+def iter_json_lines(file):
+    """Читает JSON Lines: по объекту в строке, пустые строки пропускаются."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_csv(file):
+    """Читает CSV с заголовком title,text,date."""
+    yield from csv.DictReader(file)
+
+
+READERS = {
+    'json': iter_json_array,
+    'jsonl': iter_json_lines,
+    'csv': iter_csv,
+}
+
+
+def detect_format(path):
+    """Определяет формат по расширению файла."""
+    extension = path.rsplit('.', 1)[-1].lower()
+    if extension == 'ndjson':
+        return 'jsonl'
+    if extension not in READERS:
+        raise ImportFormatError(f'Неизвестный формат файла: {path}')
+    return extension
+
+
+def iter_records(file, file_format):
+    """
+    Отдаёт словари с полями новости.
+
+    У записей в формате фикстур Django берутся только поля модели.
+    """
+    for item in READERS[file_format](file):
+        if isinstance(item, dict) and isinstance(item.get('fields'), dict):
+            item = item['fields']
+        yield item
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment
+)
+
+from news.benchmarks.api import run_api_benchmarks
+from news.benchmarks.data import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает JSON API с HTML-страницами: задержки, запросы в '
+        'секунду и размер ответов. Данные создаются в отдельной '
+        'тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            generate_dataset(options['news'], options['comments'])
+            # Кеш страниц отключён, а лента API того же размера,
+            # что и главная: сравниваем саму выдачу.
+            with override_settings(
+                FEED_CACHE_TIMEOUT=0,
+                API_PAGE_SIZE=settings.NEWS_COUNT_ON_HOME_PAGE,
+            ):
+                results = run_api_benchmarks(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<14} p50 {result["p50_ms"]:7.2f} мс  '
+                f'~{1000 / result["p50_ms"]:6.0f} запросов/с  '
+                f'{result["bytes"]:7} Б  gzip {result["gzip_bytes"]:6} Б'
+            )
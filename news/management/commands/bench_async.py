@@ -0,0 +1,70 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+
+from news.benchmarks.data import generate_dataset
+from news.benchmarks.load import run_async_load, run_threaded_load
+from news.models import News
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность синхронных страниц под '
+        'потоками (WSGI) и асинхронных страниц под ASGI при одновременных '
+        'запросах. Данные создаются в отдельной тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            generate_dataset(options['news'], options['comments'])
+            results = self.run(options['requests'], options['concurrency'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<16} {result["rps"]:8.1f} запр/с  '
+                f'p50 {result["p50_ms"]:8.2f} мс  '
+                f'p99 {result["p99_ms"]:8.2f} мс'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def run(self, requests, concurrency):
+        user = User.objects.first()
+        news = News.objects.order_by('-comment_count').first()
+        results = {}
+        for mode, urlconf, load in (
+            ('wsgi', 'yanews.urls', run_threaded_load),
+            ('asgi', 'yanews.async_urls', run_async_load),
+        ):
+            with override_settings(ROOT_URLCONF=urlconf):
+                for page, url in (
+                    ('home', reverse('news:home')),
+                    ('detail', reverse('news:detail', args=(news.pk,))),
+                ):
+                    results[f'{mode}_{page}'] = load(
+                        url, user, requests, concurrency
+                    )
+        return results
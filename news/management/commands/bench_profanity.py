@@ -0,0 +1,60 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from news.profanity import BadWordsMatcher
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def linear_scan(words, text):
+    """Прежняя реализация CommentForm.clean_text()."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость поиска запрещённых слов: линейный перебор '
+        'списка против скомпилированного матчера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=5000)
+        parser.add_argument('--text-length', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = [
+            random_word(rng, rng.randint(6, 12))
+            for _ in range(options['words'])
+        ]
+        # Чистый текст - худший случай: приходится проверить всё.
+        text = ' '.join(
+            random_word(rng, rng.randint(2, 9))
+            for _ in range(options['text_length'] // 6)
+        )
+        repeat = options['repeat']
+
+        compile_time = timeit.timeit(lambda: BadWordsMatcher(words), number=1)
+        matcher = BadWordsMatcher(words)
+
+        linear = timeit.timeit(lambda: linear_scan(words, text), number=repeat)
+        compiled = timeit.timeit(lambda: matcher.search(text), number=repeat)
+        self.stdout.write(
+            f'Слов: {len(words)}, длина текста: {len(text)}\n'
+            f'Компиляция матчера: {compile_time * 1000:.1f} мс\n'
+            f'Линейный перебор: {linear / repeat * 1000:.3f} мс/текст\n'
+            f'Матчер: {compiled / repeat * 1000:.3f} мс/текст\n'
+            f'Ускорение: {linear / compiled:.1f}x'
+        )
@@ -0,0 +1,89 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment
+)
+
+from news import search
+from news.benchmarks.timing import percentile
+from news.models import News
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'ду', 'жи', 'за', 'ко', 'ли', 'ма', 'но',
+    'пе', 'ра', 'со', 'ту', 'фи', 'ха', 'це', 'ша', 'юр', 'ям',
+)
+ENDINGS = ('', 'а', 'ы', 'ой', 'ами', 'ом', 'е')
+TARGET_MS = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время полнотекстового поиска на синтетическом корпусе. '
+        'Данные создаются в отдельной тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=100000)
+        parser.add_argument('--vocabulary', type=int, default=20000)
+        parser.add_argument('--words', type=int, default=60,
+                            help='Слов в тексте одной новости.')
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        vocabulary = list({
+            ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+            for _ in range(options['vocabulary'])
+        })
+
+        def phrase(length):
+            return ' '.join(
+                rng.choice(vocabulary) + rng.choice(ENDINGS)
+                for _ in range(length)
+            )
+
+        started = time.perf_counter()
+        total = options['news']
+        for start in range(0, total, options['batch_size']):
+            News.objects.bulk_create([
+                News(title=phrase(4)[:50], text=phrase(options['words']))
+                for _ in range(min(options['batch_size'], total - start))
+            ])
+        self.stdout.write(
+            f'Создано {total} новостей за '
+            f'{time.perf_counter() - started:.1f} с'
+        )
+
+        timings = []
+        for index in range(options['queries']):
+            query = ' '.join(
+                rng.choice(vocabulary) + rng.choice(ENDINGS)
+                for _ in range(1 + index % 2)
+            )
+            started = time.perf_counter()
+            search.search_news(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        p50 = percentile(timings, 0.5)
+        p99 = percentile(timings, 0.99)
+        self.stdout.write(
+            f'Запросов: {len(timings)}, p50 {p50:.2f} мс, p99 {p99:.2f} мс'
+        )
+        style = self.style.SUCCESS if p99 < TARGET_MS else self.style.WARNING
+        self.stdout.write(style(f'Цель p99 < {TARGET_MS} мс'))
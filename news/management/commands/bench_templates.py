@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment
+)
+
+from news.benchmarks.render import run_render_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет отрисовку страницы новости с большим числом '
+        'комментариев. Данные создаются в отдельной тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = run_render_benchmarks(
+                options['comments'], options['repeat']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<22} p50 {result["p50_ms"]:8.2f} мс  '
+                f'p99 {result["p99_ms"]:8.2f} мс  '
+                f'память {result["peak_memory_kb"]:8.1f} КБ'
+            )
@@ -0,0 +1,57 @@
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment
+)
+
+from news.benchmarks.data import generate_dataset
+from news.benchmarks.transfer import run_transfer_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает байты, передаваемые за главную страницу и страницу '
+        'новости со статикой, без сжатия и со сжатием. Статика '
+        'собирается во временный каталог, данные - в тестовую базу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=100)
+        parser.add_argument('--comments', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as static_root:
+                # При DEBUG хранилище отдаёт имена без хеша.
+                with override_settings(
+                    DEBUG=False,
+                    STATIC_ROOT=static_root,
+                    STATICFILES_STORAGE=(
+                        'yanews.storage.CompressedManifestStaticFilesStorage'
+                    ),
+                    STATIC_SERVE=True,
+                ):
+                    call_command('collectstatic', interactive=False,
+                                 verbosity=0)
+                    generate_dataset(options['news'], options['comments'])
+                    results = run_transfer_benchmarks()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        for name, result in results.items():
+            saved = 1 - result['total_gzip_bytes'] / result['total_bytes']
+            self.stdout.write(
+                f'{name:<7} HTML {result["html_bytes"]:7} → '
+                f'{result["html_gzip_bytes"]:6} Б  '
+                f'статика ({result["assets"]}) '
+                f'{result["assets_bytes"]:6} → '
+                f'{result["assets_gzip_bytes"]:5} Б  '
+                f'всего {result["total_bytes"]:7} → '
+                f'{result["total_gzip_bytes"]:6} Б (-{saved:.0%})'
+            )
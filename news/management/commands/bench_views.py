@@ -0,0 +1,74 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment
+)
+from django.utils import timezone
+
+from news.benchmarks.data import generate_dataset
+from news.benchmarks.views import run_view_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки, число SQL-запросов и память основных страниц '
+        'на синтетических данных. Данные создаются в отдельной тестовой '
+        'базе, рабочая база не затрагивается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            generate_dataset(
+                options['news'],
+                options['comments'],
+                options['users'],
+                options['batch_size'],
+            )
+            generation_time = time.perf_counter() - started
+            results = run_view_benchmarks(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'news': options['news'],
+                'comments': options['comments'],
+                'users': options['users'],
+                'generation_seconds': generation_time,
+            },
+            'results': results,
+        }
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<22} p50 {result["p50_ms"]:8.2f} мс  '
+                f'p99 {result["p99_ms"]:8.2f} мс  '
+                f'запросов {result["queries"]:3}  '
+                f'память {result["peak_memory_kb"]:8.1f} КБ'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
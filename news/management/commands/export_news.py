@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news.exporters import export
+from news.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковая выгрузка новостей или комментариев в JSON Lines или CSV. '
+        'Файлы с расширением .gz сжимаются на лету.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('news', 'comments'))
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            default='jsonl')
+        parser.add_argument('--date-from', help='ГГГГ-ММ-ДД')
+        parser.add_argument('--date-to', help='ГГГГ-ММ-ДД')
+        parser.add_argument(
+            '--since-id', type=int,
+            help='Выгрузить только записи с id больше указанного.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        form = ExportForm({
+            'kind': options['kind'],
+            'format': options['format'],
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+            'since_id': options['since_id'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        params = form.cleaned_data
+        output = options['output']
+        compress = bool(output) and output.endswith('.gz')
+        chunks = export(
+            params['kind'],
+            params['format'],
+            compress=compress,
+            chunk_size=options['chunk_size'],
+            date_from=params['date_from'],
+            date_to=params['date_to'],
+            since_id=params['since_id'],
+        )
+        if not output:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        if compress:
+            file = open(output, 'wb')
+        else:
+            file = open(output, 'w', encoding='utf-8', newline='')
+        with file:
+            for chunk in chunks:
+                file.write(chunk)
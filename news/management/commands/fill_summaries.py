@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from news.models import UPDATE_BATCH_SIZE, News
+
+
+class Command(BaseCommand):
+    help = 'Заново строит анонсы новостей для главной страницы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=UPDATE_BATCH_SIZE,
+            help='Сколько новостей обрабатывать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        updated = News.objects.fill_summaries(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено анонсов: {updated}')
+        )
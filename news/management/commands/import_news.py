@@ -0,0 +1,132 @@
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from news.importers import ImportFormatError, detect_format, iter_records
+from news.models import UPDATE_BATCH_SIZE, News
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует новости из JSON, JSON Lines или CSV. Файл читается '
+        'потоком, записи вставляются пачками через bulk_create, '
+        'дубликаты по заголовку и дате пропускаются. После сбоя импорт '
+        'продолжается с последней сохранённой пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=('json', 'jsonl', 'csv'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--state',
+            help='Файл с номером последней сохранённой записи; '
+                 'по умолчанию <path>.import-state.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Игнорировать сохранённое состояние и начать сначала.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        state = Path(options['state'] or f'{path}.import-state')
+        try:
+            file_format = options['format'] or detect_format(path.name)
+        except ImportFormatError as error:
+            raise CommandError(error)
+        done = 0
+        if state.exists() and not options['restart']:
+            done = int(state.read_text())
+            self.stdout.write(f'Продолжаем с записи {done}.')
+
+        self.created = self.skipped = self.invalid = 0
+        started = time.perf_counter()
+        with path.open(encoding='utf-8', newline='') as file:
+            records = islice(iter_records(file, file_format), done, None)
+            try:
+                while True:
+                    batch = list(islice(records, options['batch_size']))
+                    if not batch:
+                        break
+                    self.save_batch(batch)
+                    done += len(batch)
+                    state.write_text(str(done))
+                    self.report(done, started)
+            except (ValueError, csv.Error) as error:
+                raise CommandError(
+                    f'Ошибка разбора после записи {done}: {error}'
+                )
+        state.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: добавлено {self.created}, дубликатов {self.skipped}, '
+            f'некорректных записей {self.invalid}.'
+        ))
+
+    def save_batch(self, records):
+        """Сохраняет пачку в одной транзакции, отбрасывая дубликаты."""
+        candidates = {}
+        for record in records:
+            news = self.build(record)
+            if news is None:
+                self.invalid += 1
+                continue
+            key = (news.title, news.date)
+            if key in candidates:
+                self.skipped += 1
+                continue
+            candidates[key] = news
+        existing = self.existing_keys(list(candidates))
+        new_news = [
+            news for key, news in candidates.items() if key not in existing
+        ]
+        self.skipped += len(candidates) - len(new_news)
+        with transaction.atomic():
+            News.objects.bulk_create(new_news)
+        self.created += len(new_news)
+
+    def existing_keys(self, keys):
+        """
+        Пары (заголовок, дата) из keys, которые уже есть в базе.
+
+        Ищем частями: в запросе по части заголовки и даты вместе
+        дают не больше UPDATE_BATCH_SIZE параметров.
+        """
+        existing = set()
+        size = UPDATE_BATCH_SIZE // 2
+        for start in range(0, len(keys), size):
+            chunk = keys[start:start + size]
+            existing.update(News.objects.filter(
+                title__in={title for title, _ in chunk},
+                date__in={date for _, date in chunk},
+            ).values_list('title', 'date'))
+        return existing
+
+    def build(self, record):
+        """Строит новость из записи или возвращает None, если она неполная."""
+        if not isinstance(record, dict):
+            return None
+        news = News(title=record.get('title'), text=record.get('text'))
+        if record.get('date'):
+            news.date = record['date']
+        try:
+            news.clean_fields()
+        except ValidationError:
+            return None
+        return news
+
+    def report(self, done, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Обработано {done}: добавлено {self.created}, '
+            f'пропущено {self.skipped + self.invalid}, '
+            f'{self.created / elapsed:.0f} новостей/с'
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from news.models import ArchiveMonth
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает число новостей по месяцам для архива.'
+
+    def handle(self, *args, **options):
+        months = ArchiveMonth.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Месяцев в архиве: {months}')
+        )
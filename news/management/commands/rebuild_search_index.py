@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс новостей.'
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        if not search.install():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Индекс перестроен.'))
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+
+from news.comment_queue import get_comment_queue
+from news.models import Comment, News
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует комментарии из нескольких потоков одновременно и '
+        'проверяет, что SQLite не отвечает «database is locked». '
+        'Работает на временной файловой базе, чтобы блокировки были '
+        'такими же, как на боевой. Ограничение частоты отключается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--comments', type=int, default=50,
+                            help='Комментариев на каждый поток.')
+        parser.add_argument(
+            '--queued', action='store_true',
+            help='Записывать комментарии пачками через очередь.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда рассчитана на SQLite.')
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'stress.sqlite3'
+            )
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                with override_settings(
+                    COMMENT_THROTTLE_BURST=0,
+                    COMMENT_WRITE_QUEUE=options['queued'],
+                ):
+                    result = self.stress(
+                        options['threads'], options['comments']
+                    )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+        errors, stored, expected, elapsed = result
+        self.stdout.write(
+            f'Потоков: {options["threads"]}, '
+            f'комментариев: {stored} из {expected}, '
+            f'{stored / elapsed:.1f} в секунду, ошибок блокировки: {errors}'
+        )
+        if errors or stored != expected:
+            raise CommandError('Часть комментариев не сохранилась.')
+
+    def stress(self, threads_count, comments_count):
+        news = News.objects.create(title='Нагрузка', text='Текст')
+        url = reverse('news:detail', args=(news.pk,))
+        errors = []
+
+        def worker(client):
+            for index in range(comments_count):
+                try:
+                    client.post(url, {'text': f'Комментарий {index}'})
+                except OperationalError as error:
+                    errors.append(error)
+            connection.close()
+
+        threads = []
+        for index in range(threads_count):
+            client = Client()
+            client.force_login(
+                User.objects.create(username=f'stress-{index}')
+            )
+            threads.append(threading.Thread(target=worker, args=(client,)))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Хвост очереди входит в замер: считаем только записанное.
+        if settings.COMMENT_WRITE_QUEUE:
+            get_comment_queue().flush()
+        elapsed = time.perf_counter() - started
+        return (
+            len(errors),
+            Comment.objects.count(),
+            threads_count * comments_count,
+            elapsed,
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.15 on 2026-10-17 02:22
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+SUMMARY_WORDS = 15
+SUMMARY_LENGTH = 255
+
+
+def summarize(text):
+    """Копия news.text.summarize: миграция не зависит от её правок."""
+    return Truncator(
+        Truncator(text).words(SUMMARY_WORDS)
+    ).chars(SUMMARY_LENGTH)
+
+
+def fill_summary(apps, schema_editor):
+    """Заполняет анонсы пачками по первичному ключу."""
+    News = apps.get_model('news', 'News')
+    last_pk = 0
+    while True:
+        batch = list(
+            News.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                'id', 'text'
+            )[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for item in batch:
+            item.summary = summarize(item.text)
+        News.objects.bulk_update(batch, ('summary',))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='summary',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_summary, migrations.RunPython.noop),
+    ]
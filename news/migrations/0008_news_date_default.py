@@ -0,0 +1,21 @@
+# Generated by Django 3.2.15 on 2026-10-17 03:20
+
+import datetime
+from django.db import migrations, models
+
+
+# Значение по умолчанию есть в модели с самого начала, но не попало
+# в 0001_initial. Миграция только выравнивает состояние.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_archive_month'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='news',
+            name='date',
+            field=models.DateField(default=datetime.datetime.today),
+        ),
+    ]
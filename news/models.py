@@ -1,22 +1,161 @@
-from datetime import datetime
+from collections import Counter, defaultdict
+from datetime import date, datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .cache import bump_feed_version
+from .text import SUMMARY_LENGTH, summarize
+
+# SQLite ограничивает число параметров в одном запросе.
+UPDATE_BATCH_SIZE = 500
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Массовое создание новостей сбрасывает кеш ленты.
+
+        bulk_create() не вызывает save(), поэтому анонсы заполняем здесь.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.summary = summarize(obj.text)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            ArchiveMonth.objects.shift(
+                Counter(month_of(obj.date) for obj in objs)
+            )
+        transaction.on_commit(bump_feed_version, using=self.db)
+        return objs
+
+    def feed(self):
+        """Только колонки, которые нужны ленте; полный текст не читаем."""
+        return self.only(
+            'id', 'title', 'date', 'summary', 'comment_count', 'updated_at'
+        )
+
+    def fill_summaries(self, batch_size=UPDATE_BATCH_SIZE):
+        """
+        Заново строит анонсы новостей по их текстам.
+
+        Новости читаются пачками по первичному ключу, поэтому память
+        не зависит от размера таблицы. Изменённые новости отмечаются
+        обновлёнными, чтобы сбросить их ETag и кешированные фрагменты.
+        Возвращает число изменённых.
+        """
+        updated = 0
+        last_pk = 0
+        now = timezone.now()
+        queryset = self.only('id', 'text', 'summary').order_by('pk')
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for news in batch:
+                summary = summarize(news.text)
+                if news.summary != summary:
+                    news.summary = summary
+                    news.updated_at = now
+                    changed.append(news)
+            self.model.objects.bulk_update(changed, ('summary', 'updated_at'))
+            updated += len(changed)
+        if updated:
+            transaction.on_commit(bump_feed_version, using=self.db)
+        return updated
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигает счётчики комментариев новостей на delta."""
+        return self.update(
+            comment_count=F('comment_count') + delta, updated_at=timezone.now()
+        )
+
+    def touch(self):
+        """Отмечает новости изменёнными, например после правки комментария."""
+        return self.update(updated_at=timezone.now())
+
+    def recount_comments(self):
+        """Пересчитывает счётчики комментариев по таблице комментариев."""
+        comments = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(total=Count('pk'))
+        updated = self.update(
+            comment_count=Coalesce(Subquery(comments.values('total')), 0),
+            updated_at=timezone.now(),
+        )
+        transaction.on_commit(bump_feed_version, using=self.db)
+        return updated
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    summary = models.CharField(
+        max_length=SUMMARY_LENGTH, blank=True, editable=False
+    )
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-date',)
+        ordering = ('-date', '-id')
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженную дату, чтобы заметить смену месяца."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_date = instance.__dict__.get('date')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Анонс для главной строится из текста при каждом сохранении."""
+        self.summary = summarize(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'summary'}
+        super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Массовое создание комментариев.
+
+        bulk_create() не отправляет сигналы, поэтому счётчики
+        комментариев у новостей и версию ленты обновляем здесь же.
+        Новости с одинаковым приростом обновляются одним запросом.
+        """
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            by_delta = defaultdict(list)
+            per_news = Counter(obj.news_id for obj in objs)
+            for news_id, count in per_news.items():
+                by_delta[count].append(news_id)
+            for count, news_ids in by_delta.items():
+                for start in range(0, len(news_ids), UPDATE_BATCH_SIZE):
+                    News.objects.filter(
+                        pk__in=news_ids[start:start + UPDATE_BATCH_SIZE]
+                    ).change_comment_count(count)
+        transaction.on_commit(bump_feed_version, using=self.db)
+        return objs
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -29,9 +168,93 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'), name='comment_author_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+def month_of(value):
+    """Год и месяц даты - ключ корзины архива."""
+    return value.year, value.month
+
+
+class ArchiveMonthQuerySet(models.QuerySet):
+
+    def shift(self, deltas):
+        """
+        Сдвигает счётчики новостей по месяцам.
+
+        deltas - словарь {(год, месяц): прирост}. Отсутствующий
+        месяц создаётся; при гонке двух создателей второй
+        просто повторяет обновление.
+        """
+        for (year, month), delta in deltas.items():
+            if not delta:
+                continue
+            months = self.filter(year=year, month=month)
+            if months.update(news_count=F('news_count') + delta):
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(year=year, month=month, news_count=delta)
+            except IntegrityError:
+                months.update(news_count=F('news_count') + delta)
+
+    def rebuild(self):
+        """Пересчитывает счётчики по таблице новостей."""
+        counts = News.objects.order_by().annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values('year', 'month').annotate(total=Count('pk'))
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            return len(self.bulk_create(
+                self.model(
+                    year=row['year'],
+                    month=row['month'],
+                    news_count=row['total'],
+                )
+                for row in counts
+            ))
+
+
+class ArchiveMonth(models.Model):
+    """
+    Число новостей за месяц для навигации по архиву.
+
+    Поддерживается сигналами и NewsQuerySet.bulk_create(); после
+    массовых update() по датам нужна команда rebuild_archive.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    news_count = models.IntegerField(default=0)
+
+    objects = ArchiveMonthQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-year', '-month')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('year', 'month'), name='archive_month_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.month:02}.{self.year}: {self.news_count}'
+
+    @property
+    def first_day(self):
+        return date(self.year, self.month, 1)
@@ -0,0 +1,126 @@
+"""
+Курсорная (keyset) пагинация.
+
+Вместо OFFSET запоминаем значения полей сортировки последней выданной
+записи и продолжаем выборку строго после неё. Такой запрос идёт по индексу
+и стоит одинаково на любой глубине.
+"""
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не подходит к порядку сортировки."""
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    Сохраняет время с микросекундами.
+
+    DjangoJSONEncoder округляет время до миллисекунд, а курсору нужна
+    точная копия значения из базы, иначе граница страницы сместится.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(obj, ordering):
+    """
+    Упаковывает значения полей сортировки объекта в строку.
+
+    obj - объект модели или словарь из values().
+    """
+    names = [field.lstrip('-') for field in ordering]
+    if isinstance(obj, dict):
+        values = [obj[name] for name in names]
+    else:
+        values = [getattr(obj, name) for name in names]
+    raw = json.dumps(values, cls=CursorEncoder).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(model, cursor, ordering):
+    """Распаковывает курсор и приводит значения к типам полей модели."""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor(cursor)
+    # Курсор хранит только строки (даты, время) и целые числа (id);
+    # null и прочие значения не сравнить с полем в запросе.
+    if not all(
+        isinstance(value, (str, int)) and not isinstance(value, bool)
+        for value in values
+    ):
+        raise InvalidCursor(cursor)
+    try:
+        values = [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except ValidationError:
+        raise InvalidCursor(cursor)
+    if None in values:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def _after(ordering, values):
+    """
+    Строит условие «строго после» для составного ключа сортировки.
+
+    Для ключа (a, b) это a > x OR (a = x AND b > y),
+    направление сравнения берётся из знака поля.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def keyset_queryset(queryset, ordering, size, cursor=None):
+    """
+    Запрос страницы после курсора.
+
+    Берёт на одну запись больше размера страницы, чтобы без отдельного
+    COUNT понять, есть ли следующая страница.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(queryset.model, cursor, ordering)
+        queryset = queryset.filter(_after(ordering, values))
+    return queryset[:size + 1]
+
+
+def split_page(items, ordering, size):
+    """Отделяет от результата keyset_queryset() курсор следующей страницы."""
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, encode_cursor(items[-1], ordering)
+
+
+def keyset_page(queryset, ordering, size, cursor=None):
+    """
+    Возвращает страницу объектов и курсор следующей страницы.
+
+    Последний элемент ordering должен быть уникальным (обычно id),
+    иначе записи с одинаковыми ключами могут потеряться между страницами.
+    Курсор равен None, если дальше записей нет.
+    """
+    items = list(keyset_queryset(queryset, ordering, size, cursor))
+    return split_page(items, ordering, size)
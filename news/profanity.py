@@ -0,0 +1,142 @@
+"""
+Поиск запрещённых слов в тексте.
+
+Список слов один раз компилируется в регулярное выражение, построенное
+по префиксному дереву основ, поэтому текст просматривается за один проход
+независимо от длины списка.
+"""
+import logging
+import os
+import re
+import time
+
+from django.conf import settings
+
+from .text import normalize, stem
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_pattern(node):
+    """Превращает узел префиксного дерева в фрагмент регулярного выражения."""
+    if '' in node:
+        # Основа закончилась: дальше можно не смотреть.
+        return ''
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+class BadWordsMatcher:
+    """Ищет в тексте основы запрещённых слов."""
+
+    def __init__(self, words):
+        trie = {}
+        for word in words:
+            node = trie
+            for char in stem(word):
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self.regex = re.compile(_trie_pattern(trie)) if trie else None
+
+    def search(self, text):
+        """Возвращает первое найденное запрещённое слово или None."""
+        if self.regex is None:
+            return None
+        match = self.regex.search(normalize(text))
+        return match.group() if match else None
+
+
+def read_words(path):
+    """Читает слова из файла: по одному в строке, # - комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+# Состояние модуля читается из потоков обработки запросов без блокировок,
+# поэтому каждое значение - неизменяемый кортеж, который заменяется
+# одним присваиванием, а не меняется на месте.
+# Последний собранный матчер: (ключ, матчер).
+_matcher = (None, None)
+# Последняя проверка файла: (путь, время проверки, ключ матчера).
+_checked = (None, 0.0, None)
+
+
+def _file_key(path):
+    """
+    Ключ матчера для файла слов: путь и время изменения.
+
+    Файл проверяется не чаще раза в BAD_WORDS_CHECK_INTERVAL секунд,
+    а не при каждом сохранении комментария. None - файл не прочитать.
+    """
+    global _checked
+    now = time.monotonic()
+    checked_path, checked_at, key = _checked
+    if (checked_path == path
+            and now - checked_at < settings.BAD_WORDS_CHECK_INTERVAL):
+        return key
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        logger.warning(
+            'Файл запрещённых слов %s недоступен, '
+            'используется прежний список.', path, exc_info=True,
+        )
+        key = None
+    _checked = (path, now, key)
+    return key
+
+
+def _compile(key, words):
+    global _matcher
+    matcher = BadWordsMatcher(words)
+    _matcher = (key, matcher)
+    return matcher
+
+
+def get_matcher(default_words):
+    """
+    Возвращает скомпилированный матчер.
+
+    Если в настройках задан BAD_WORDS_FILE, слова берутся из него,
+    а матчер пересобирается, как только у файла меняется время
+    изменения. Иначе используется переданный список по умолчанию.
+    Если файл пропал или не читается, остаётся последний собранный
+    матчер, а без него - список по умолчанию.
+    """
+    global _checked
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    key = _file_key(path) if path else None
+    if key is None:
+        return _fallback(path, default_words)
+    built_key, matcher = _matcher
+    if built_key != key:
+        try:
+            words = read_words(path)
+        except OSError:
+            logger.warning(
+                'Не удалось прочитать файл запрещённых слов %s, '
+                'используется прежний список.', path, exc_info=True,
+            )
+            _checked = (path, time.monotonic(), None)
+            return _fallback(path, default_words)
+        matcher = _compile(key, words)
+    return matcher
+
+
+def _fallback(path, default_words):
+    """Последний собранный матчер из файла или матчер списка по умолчанию."""
+    built_key, matcher = _matcher
+    if path and matcher is not None:
+        return matcher
+    key = tuple(default_words)
+    if built_key == key:
+        return matcher
+    return _compile(key, default_words)
@@ -1,7 +1,12 @@
 import random
+from copy import deepcopy
 from datetime import datetime, timedelta
 
 import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
 from django.test.client import Client
 from django.urls import reverse
 from django.utils import timezone
@@ -9,50 +14,101 @@ from django.utils import timezone
 from news.models import Comment, News
 
 COUNT = 12
+# Пользователи, общие для всех тестов: ключ фикстуры и имя.
+SHARED_USERS = {
+    'author': 'Автор',
+    'not_author': 'Не автор',
+}
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    Создаёт общих пользователей и их сессии один раз на прогон.
+
+    Записи попадают в тестовую базу до транзакций отдельных тестов,
+    поэтому откат теста их не затрагивает. Под pytest-xdist у каждого
+    процесса своя база и свои пользователи. Пользователи берутся
+    через get_or_create, а по окончании прогона удаляются вместе
+    с сессиями, так что база, сохранённая --reuse-db, остаётся чистой.
+    Отдаёт словарь: ключ фикстуры -> (пользователь, ключ сессии).
+    """
+    shared = {}
+    with django_db_blocker.unblock():
+        for key, username in SHARED_USERS.items():
+            user, _ = get_user_model().objects.get_or_create(
+                username=username
+            )
+            client = Client()
+            client.force_login(user)
+            shared[key] = (
+                user, client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+    yield shared
+    with django_db_blocker.unblock():
+        Session.objects.filter(
+            session_key__in=[key for _, key in shared.values()]
+        ).delete()
+        get_user_model().objects.filter(
+            pk__in=[user.pk for user, _ in shared.values()]
+        ).delete()
+
+
+def logged_in_client(session_key):
+    """Клиент с готовой сессией: вход без записи в базу."""
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    return client
 
 
-@pytest.fixture
-def author(django_user_model):
+@pytest.fixture(autouse=True)
+def clear_cache():
     """
-    Фикстура для создания пользователя-автора.
+    Фикстура для очистки кеша перед каждым тестом.
 
-    Создает пользователя с именем 'Автор'.
+    База откатывается после каждого теста, а кеш - нет, поэтому
+    без очистки тест может получить страницу, отрисованную для чужих данных.
+    Очищаются все кеши, включая фрагменты шаблонов.
     """
-    return django_user_model.objects.create(username='Автор')
+    for alias in settings.CACHES:
+        caches[alias].clear()
 
 
 @pytest.fixture
-def not_author(django_user_model):
+def author(django_db_setup):
     """
-    Фикстура для создания пользователя, который не является автором.
+    Фикстура пользователя-автора с именем 'Автор'.
 
-    Создает пользователя с именем 'Не автор'.
+    Возвращает копию общего пользователя, чтобы изменения
+    в одном тесте не были видны в других.
     """
-    return django_user_model.objects.create(username='Не автор')
+    return deepcopy(django_db_setup['author'][0])
+
+
+@pytest.fixture
+def not_author(django_db_setup):
+    """Фикстура пользователя с именем 'Не автор', который не автор."""
+    return deepcopy(django_db_setup['not_author'][0])
 
 
 @pytest.fixture
-def author_client(author):
+def author_client(django_db_setup):
     """
     Фикстура для создания клиента, авторизованного как автор.
 
     Возвращает объект клиента, входящего в систему от имени автора.
     """
-    client = Client()
-    client.force_login(author)
-    return client
+    return logged_in_client(django_db_setup['author'][1])
 
 
 @pytest.fixture
-def not_author_client(not_author):
+def not_author_client(django_db_setup):
     """
     Фикстура для создания клиента, авторизованного как не автор.
 
     Возвращает объект клиента, входящего в систему от имени не автора.
     """
-    client = Client()
-    client.force_login(not_author)
-    return client
+    return logged_in_client(django_db_setup['not_author'][1])
 
 
 @pytest.fixture
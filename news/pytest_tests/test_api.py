@@ -0,0 +1,113 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def no_model_instances(monkeypatch):
+    """Запрещает создание объектов моделей из строк базы."""
+    def forbidden(*args, **kwargs):
+        raise AssertionError('API не должно создавать объекты моделей.')
+
+    monkeypatch.setattr(News, 'from_db', forbidden)
+    monkeypatch.setattr(Comment, 'from_db', forbidden)
+
+
+@pytest.mark.usefixtures('no_model_instances')
+def test_feed_pages_with_sparse_fields(client, settings, multiple_news):
+    """
+    Проверяет, что лента отдаёт только запрошенные поля,
+    листается курсором и строится из values() без объектов моделей.
+    """
+    settings.API_PAGE_SIZE = 5
+    url = reverse('news:api_feed')
+    titles = []
+    params = {'fields': 'title,id'}
+    while True:
+        data = client.get(url, params).json()
+        assert all(list(item) == ['title', 'id'] for item in data['results'])
+        titles.extend(item['title'] for item in data['results'])
+        if data['next'] is None:
+            break
+        params['after'] = data['next']
+    assert titles == list(News.objects.values_list('title', flat=True))
+
+
+@pytest.mark.usefixtures('no_model_instances')
+def test_comments_in_rows_format(client, comment):
+    """
+    Проверяет компактный формат: список полей один раз
+    и строки-массивы, имя автора вместо его id.
+    """
+    response = client.get(
+        reverse('news:api_comments', args=(comment.news_id,)),
+        {'fields': 'author,text', 'format': 'rows'},
+    )
+    assert response.json() == {
+        'fields': ['author', 'text'],
+        'rows': [[comment.author.username, comment.text]],
+        'next': None,
+    }
+
+
+def test_detail_is_gzipped_and_supports_conditional_get(client, news):
+    """
+    Проверяет, что длинный ответ сжимается, если клиент принимает gzip,
+    а повторный запрос с ETag получает 304 без тела.
+    """
+    News.objects.filter(pk=news.pk).update(text='Длинный текст. ' * 100)
+    url = reverse('news:api_detail', args=(news.pk,))
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    data = json.loads(gzip.decompress(response.content))
+    assert data['text'].startswith('Длинный текст.')
+    repeat = client.get(
+        url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+    assert not repeat.content
+    plain = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert plain.status_code == HTTPStatus.OK
+    assert 'Content-Encoding' not in plain
+
+
+def test_new_comment_changes_comments_etag(author_client, client, news,
+                                           form_data):
+    """Проверяет, что новый комментарий меняет ETag страниц комментариев."""
+    url = reverse('news:api_comments', args=(news.pk,))
+    etag = client.get(url)['ETag']
+    author_client.post(reverse('news:detail', args=(news.pk,)), form_data)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['results']) == 1
+
+
+@pytest.mark.parametrize(
+    'name, params',
+    (
+        ('news:api_feed', {'fields': 'title,password'}),
+        ('news:api_feed', {'format': 'xml'}),
+        ('news:api_feed', {'after': 'испорчен'}),
+        # Курсор [null, null].
+        ('news:api_feed', {'after': 'W251bGwsIG51bGxd'}),
+    ),
+)
+def test_bad_parameters_are_rejected(client, name, params):
+    """Проверяет, что ошибки в параметрах дают 400 с описанием."""
+    response = client.get(reverse(name), params)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['error']
+
+
+def test_missing_news_is_not_found(client):
+    """Проверяет, что несуществующая новость даёт 404."""
+    response = client.get(reverse('news:api_comments', args=(999,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
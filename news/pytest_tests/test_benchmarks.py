@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+
+from news.benchmarks.api import run_api_benchmarks
+from news.benchmarks.data import generate_dataset
+from news.benchmarks.render import run_render_benchmarks
+from news.benchmarks.transfer import run_transfer_benchmarks
+from news.benchmarks.views import run_view_benchmarks
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+def test_generate_dataset_keeps_counters_consistent():
+    """
+    Проверяет, что синтетические данные создаются в нужном объёме,
+    а счётчики комментариев совпадают с реальным числом комментариев.
+    """
+    generate_dataset(news_count=7, comments_count=30, users_count=3,
+                     batch_size=4)
+    assert News.objects.count() == 7
+    assert Comment.objects.count() == 30
+    for news in News.objects.all():
+        assert news.comment_count == news.comment_set.count()
+
+
+def test_generate_dataset_without_users_creates_author():
+    """Проверяет, что при users_count=0 комментариям всё равно есть автор."""
+    users = generate_dataset(news_count=1, comments_count=2, users_count=0)
+    assert len(users) == 1
+    assert Comment.objects.filter(author=users[0]).count() == 2
+
+
+def test_run_view_benchmarks_reports_every_scenario():
+    """
+    Проверяет, что прогон сценариев возвращает задержки,
+    число запросов и пиковую память для каждого сценария.
+    """
+    generate_dataset(news_count=3, comments_count=6, users_count=2)
+    results = run_view_benchmarks(repeat=2)
+    assert set(results) == {
+        'home_anonymous', 'home_authenticated',
+        'detail_anonymous', 'detail_authenticated',
+        'comment_create', 'comment_update', 'comment_delete',
+    }
+    for result in results.values():
+        assert result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+        assert result['queries'] >= 0
+        assert result['peak_memory_kb'] > 0
+
+
+def test_render_benchmarks_do_not_query_database():
+    """
+    Проверяет, что замер отрисовки не обращается к базе:
+    все комментарии загружаются до начала замеров.
+    """
+    results = run_render_benchmarks(comments_count=5, repeat=2)
+    assert 'detail_warm_fragments' in results
+    assert all(result['queries'] == 0 for result in results.values())
+
+
+def test_api_benchmarks_compare_with_html():
+    """
+    Проверяет, что сравнение API с HTML даёт пары замеров
+    с размерами ответов, и сжатый ответ API не больше несжатого.
+    """
+    generate_dataset(news_count=3, comments_count=6, users_count=2)
+    results = run_api_benchmarks(repeat=2)
+    assert set(results) == {
+        f'{name}_{kind}'
+        for name in ('feed', 'detail', 'comments')
+        for kind in ('html', 'api')
+    }
+    for name in ('feed', 'detail', 'comments'):
+        api = results[f'{name}_api']
+        assert 0 < api['gzip_bytes'] <= api['bytes']
+
+
+def test_transfer_benchmarks_show_compression(settings, tmp_path):
+    """
+    Проверяет, что со сжатием страницы со статикой весят меньше,
+    и статика со страниц находится и учитывается.
+    """
+    settings.STATIC_ROOT = str(tmp_path)
+    settings.STATICFILES_STORAGE = (
+        'yanews.storage.CompressedManifestStaticFilesStorage'
+    )
+    settings.STATIC_SERVE = True
+    call_command('collectstatic', interactive=False, verbosity=0)
+    generate_dataset(news_count=3, comments_count=6, users_count=2)
+    results = run_transfer_benchmarks()
+    assert set(results) == {'home', 'detail'}
+    for result in results.values():
+        assert result['assets'] > 0
+        assert 0 < result['total_gzip_bytes'] < result['total_bytes']
@@ -0,0 +1,205 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from news.importers import ImportFormatError, iter_json_array
+from news.models import UPDATE_BATCH_SIZE, ArchiveMonth, Comment, News
+
+pytestmark = pytest.mark.django_db
+
+FIXTURE = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+
+
+def test_loaddata_fixture_then_fill_summaries():
+    """
+    Проверяет шаги из README: loaddata штатной фикстуры и построение
+    анонсов, которые loaddata не заполняет.
+    """
+    call_command('loaddata', 'news.json', stdout=StringIO())
+    expected = len(json.loads(FIXTURE.read_text(encoding='utf-8')))
+    assert News.objects.count() == expected
+    assert not News.objects.exclude(summary='').exists()
+    output = StringIO()
+    call_command('fill_summaries', stdout=output)
+    assert not News.objects.filter(summary='').exists()
+    assert str(expected) in output.getvalue()
+
+
+def test_loaddata_fixture_then_rebuild_archive():
+    """
+    Проверяет, что loaddata не трогает архив по месяцам,
+    а rebuild_archive строит его по загруженным новостям.
+    """
+    call_command('loaddata', 'news.json', stdout=StringIO())
+    assert not ArchiveMonth.objects.exists()
+    call_command('rebuild_archive', stdout=StringIO())
+    assert sum(
+        ArchiveMonth.objects.values_list('news_count', flat=True)
+    ) == News.objects.count()
+
+
+def test_loaddata_comments_then_recount(tmp_path, news, author):
+    """
+    Проверяет, что loaddata не сдвигает счётчик комментариев,
+    а recount_comments после неё его восстанавливает.
+    """
+    path = tmp_path / 'comments.json'
+    path.write_text(json.dumps([{
+        'model': 'news.comment',
+        'fields': {
+            'news': news.pk,
+            'author': author.pk,
+            'text': 'Из фикстуры',
+            'created': '2022-01-01T00:00:00Z',
+            'updated_at': '2022-01-01T00:00:00Z',
+        },
+    }]), encoding='utf-8')
+    call_command('loaddata', str(path), stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def import_news(path, *args):
+    call_command('import_news', str(path), *args, stdout=StringIO())
+
+
+def test_import_news_from_fixture(tmp_path):
+    """
+    Проверяет импорт штатной фикстуры news.json.
+
+    Ожидается, что все новости будут добавлены, а повторный импорт
+    не создаст дубликатов по заголовку и дате. Файл состояния
+    пишется во временный каталог, а не рядом с фикстурой.
+    """
+    expected = len(json.loads(FIXTURE.read_text(encoding='utf-8')))
+    state = str(tmp_path / 'news.import-state')
+    import_news(FIXTURE, '--batch-size', '4', '--state', state)
+    assert News.objects.count() == expected
+    import_news(FIXTURE, '--state', state)
+    assert News.objects.count() == expected
+
+
+def test_import_news_from_jsonl_and_csv(tmp_path):
+    """
+    Проверяет импорт из JSON Lines и CSV, включая пропуск
+    некорректных записей и дубликатов внутри файла.
+    """
+    jsonl = tmp_path / 'news.jsonl'
+    jsonl.write_text(
+        '{"title": "Первая", "text": "Текст", "date": "2022-01-01"}\n'
+        '\n'
+        '{"title": "Первая", "text": "Копия", "date": "2022-01-01"}\n'
+        '{"title": "Без текста"}\n',
+        encoding='utf-8',
+    )
+    table = tmp_path / 'news.csv'
+    table.write_text(
+        'title,text,date\nВторая,"Текст, с запятой",2022-01-02\n',
+        encoding='utf-8',
+    )
+    import_news(jsonl)
+    import_news(table)
+    assert sorted(News.objects.values_list('title', 'text')) == [
+        ('Вторая', 'Текст, с запятой'),
+        ('Первая', 'Текст'),
+    ]
+
+
+def test_import_news_finds_duplicates_in_large_batch(tmp_path):
+    """
+    Проверяет, что дубликаты находятся во всей большой пачке, а поиск
+    разбит на запросы, укладывающиеся в лимит параметров SQLite.
+    """
+    path = tmp_path / 'news.jsonl'
+    path.write_text(''.join(
+        json.dumps({
+            'title': f'Новость {index}',
+            'text': 'Текст',
+            'date': f'2022-01-{index % 28 + 1:02}',
+        }) + '\n'
+        for index in range(UPDATE_BATCH_SIZE + 100)
+    ), encoding='utf-8')
+    import_news(path)
+    assert News.objects.count() == UPDATE_BATCH_SIZE + 100
+    with CaptureQueriesContext(connection) as context:
+        import_news(path, '--restart')
+    assert News.objects.count() == UPDATE_BATCH_SIZE + 100
+    lookups = [
+        query['sql'] for query in context.captured_queries
+        if '"title" IN' in query['sql']
+    ]
+    # 600 пар по UPDATE_BATCH_SIZE // 2 = 250 в запросе.
+    assert len(lookups) == 3
+
+
+def test_json_array_reader_handles_small_chunks_and_caps_item_size():
+    """
+    Проверяет, что JSON-массив читается по элементам при любом
+    размере куска, а слишком длинный элемент даёт понятную ошибку.
+    """
+    items = [{'title': f'Новость {index}', 'text': 'Текст'}
+             for index in range(20)]
+    text = ' [ ' + ' , '.join(json.dumps(item) for item in items) + ' ] '
+    for chunk_size in (1, 7, len(text)):
+        assert list(
+            iter_json_array(StringIO(text), chunk_size=chunk_size)
+        ) == items
+    with pytest.raises(ImportFormatError, match='длиннее 100 символов'):
+        list(iter_json_array(
+            StringIO(json.dumps([{'text': 'x' * 200}])),
+            chunk_size=16, max_item_size=100,
+        ))
+    with pytest.raises(ImportFormatError, match='обрывается'):
+        list(iter_json_array(StringIO(text[:-5]), chunk_size=7))
+
+
+def test_import_news_resumes_after_failure(tmp_path):
+    """
+    Проверяет, что после сбоя импорт продолжается с последней
+    сохранённой пачки, а по окончании состояние удаляется.
+    """
+    lines = [
+        json.dumps({'title': f'Новость {index}', 'text': 'Текст'})
+        for index in range(5)
+    ]
+    path = tmp_path / 'news.jsonl'
+    path.write_text('\n'.join(lines[:4] + ['{обрыв']), encoding='utf-8')
+    with pytest.raises(CommandError):
+        import_news(path, '--batch-size', '2')
+    state = tmp_path / 'news.jsonl.import-state'
+    assert state.read_text() == '4'
+    assert News.objects.count() == 4
+
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    News.objects.filter(title='Новость 0').delete()
+    import_news(path, '--batch-size', '2')
+    assert News.objects.count() == 4
+    assert not state.exists()
+
+
+def test_export_news_command(tmp_path, multiple_comments):
+    """
+    Проверяет выгрузку комментариев в сжатый файл JSON Lines
+    с фильтром по id.
+    """
+    since_id = min(Comment.objects.values_list('id', flat=True))
+    path = tmp_path / 'comments.jsonl.gz'
+    call_command(
+        'export_news', 'comments', '--output', str(path),
+        '--since-id', str(since_id), '--chunk-size', '5',
+    )
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        rows = [json.loads(line) for line in file]
+    assert len(rows) == len(multiple_comments) - 1
+    assert [row['id'] for row in rows] == sorted(row['id'] for row in rows)
+    assert rows[0]['author__username'] == 'Автор'
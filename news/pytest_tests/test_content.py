@@ -1,12 +1,23 @@
-from datetime import timedelta
+from base64 import urlsafe_b64encode
+from datetime import date, timedelta
+from http import HTTPStatus
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.cache import get_max_age
 
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.templatetags.news_urls import pk_reverse
 
 pytestmark = pytest.mark.django_db
 
+URLS_MODULES = ('yanews.urls', 'yanews.async_urls')
+# Курсор правильного формата, но с null вместо даты и id.
+NULL_CURSOR = urlsafe_b64encode(b'[null, null]').decode().rstrip('=')
+
 
 @pytest.mark.usefixtures('multiple_news')
 def test_news_count_on_home_page(author_client):
@@ -74,3 +85,277 @@ def test_authorized_user_can_see_comment_form(not_author_client, news):
     response = not_author_client.get(reverse('news:detail', args=(news.pk,)))
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_home_page_is_cached_for_anonymous_user(client, news,
+                                                django_assert_num_queries):
+    """
+    Проверяет, что анонимный пользователь получает ленту из кеша.
+
+    Повторный запрос главной страницы не должен обращаться к базе данных.
+    """
+    url = reverse('news:home')
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content
+
+
+def test_home_page_cache_is_invalidated_by_comment(
+        client, author_client, news, form_data,
+        django_capture_on_commit_callbacks):
+    """
+    Проверяет, что новый комментарий сбрасывает кеш ленты.
+
+    Версия ленты меняется только после коммита, поэтому до него
+    анонимный пользователь видит прежнюю страницу, а после —
+    обновлённый счётчик комментариев.
+    """
+    url = reverse('news:home')
+    assert 'Комментариев: 1' not in client.get(url).content.decode()
+    with django_capture_on_commit_callbacks() as callbacks:
+        author_client.post(reverse('news:detail', args=(news.pk,)),
+                           data=form_data)
+    assert 'Комментариев: 1' not in client.get(url).content.decode()
+    for callback in callbacks:
+        callback()
+    assert 'Комментариев: 1' in client.get(url).content.decode()
+
+
+def test_detail_page_shows_first_page_of_comments(client, settings,
+                                                  multiple_comments):
+    """
+    Проверяет, что страница новости выводит только первую страницу
+    комментариев и курсор для загрузки следующей.
+    """
+    settings.COMMENTS_PAGE_SIZE = 5
+    news_pk = multiple_comments[0].news_id
+    response = client.get(reverse('news:detail', args=(news_pk,)))
+    assert len(response.context['comments']) == 5
+    assert response.context['next_cursor']
+
+
+def test_load_more_walks_all_comments_in_order(client, settings,
+                                               multiple_comments):
+    """
+    Проверяет, что постраничная загрузка в формате JSON отдаёт каждый
+    комментарий ровно один раз и в порядке создания.
+    """
+    settings.COMMENTS_PAGE_SIZE = 5
+    url = reverse('news:comments', args=(multiple_comments[0].news_id,))
+    ids, params = [], {'format': 'json'}
+    while True:
+        page = client.get(url, params).json()
+        ids.extend(comment['id'] for comment in page['comments'])
+        if page['next'] is None:
+            break
+        params['after'] = page['next']
+    expected = Comment.objects.order_by('created', 'id')
+    assert ids == list(expected.values_list('id', flat=True))
+
+
+@pytest.mark.parametrize('cursor', ('не курсор', NULL_CURSOR))
+def test_load_more_rejects_broken_cursor(client, news, cursor):
+    """
+    Проверяет, что повреждённый курсор или курсор с пустыми
+    значениями приводит к ответу 400.
+    """
+    url = reverse('news:comments', args=(news.pk,))
+    response = client.get(url, {'after': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.urls('yanews.async_urls')
+@pytest.mark.usefixtures('multiple_news')
+def test_async_home_page_matches_sync(client, author_client, settings):
+    """
+    Проверяет, что асинхронная главная страница выводит
+    те же новости, что и синхронная.
+    """
+    response = author_client.get(reverse('news:home'))
+    dates = [news.date for news in response.context['object_list']]
+    assert len(dates) == settings.NEWS_COUNT_ON_HOME_PAGE
+    assert dates == sorted(dates, reverse=True)
+    assert client.get(reverse('news:home')).status_code == HTTPStatus.OK
+
+
+@pytest.mark.urls('yanews.async_urls')
+def test_async_detail_page(client, author_client, comment, form_data):
+    """
+    Проверяет асинхронную страницу новости: комментарии, форма
+    для авторизованного пользователя и публикация комментария.
+    """
+    url = reverse('news:detail', args=(comment.news_id,))
+    response = client.get(url)
+    assert list(response.context['comments']) == [comment]
+    assert 'form' not in response.context
+    assert isinstance(author_client.get(url).context['form'], CommentForm)
+    author_client.post(url, data=form_data)
+    assert Comment.objects.count() == 2
+    assert client.get(reverse('news:detail', args=(0,))).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.parametrize('urls_module', URLS_MODULES)
+@pytest.mark.parametrize('client_name', ('client', 'author_client'))
+def test_repeat_visit_gets_not_modified(request, client_name, news, settings,
+                                        urls_module):
+    """
+    Проверяет, что повторный запрос с актуальным ETag получает 304
+    без отрисовки шаблона, в том числе в асинхронных представлениях.
+    """
+    settings.ROOT_URLCONF = urls_module
+    client = request.getfixturevalue(client_name)
+    for url in (reverse('news:home'), reverse('news:detail', args=(news.pk,))):
+        first = client.get(url)
+        assert first.has_header('Last-Modified')
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.context is None
+
+
+@pytest.mark.parametrize('urls_module', URLS_MODULES)
+def test_edited_comment_changes_detail_etag(author_client, comment, settings,
+                                            urls_module):
+    """
+    Проверяет, что правка комментария меняет ETag страницы новости,
+    и клиент получает новую версию вместо 304.
+    """
+    settings.ROOT_URLCONF = urls_module
+    url = reverse('news:detail', args=(comment.news_id,))
+    etag = author_client.get(url)['ETag']
+    author_client.post(reverse('news:edit', args=(comment.pk,)),
+                       data={'text': 'Исправленный текст'})
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+    assert 'Исправленный текст' in response.content.decode()
+
+
+@pytest.mark.parametrize('urls_module', URLS_MODULES)
+def test_etag_depends_on_user(client, author_client, news, settings,
+                              urls_module):
+    """Проверяет, что разные пользователи получают разные ETag."""
+    settings.ROOT_URLCONF = urls_module
+    url = reverse('news:detail', args=(news.pk,))
+    assert client.get(url)['ETag'] != author_client.get(url)['ETag']
+
+
+@pytest.mark.parametrize('urls_module', URLS_MODULES)
+def test_anonymous_detail_page_is_publicly_cacheable(client, news, settings,
+                                                     urls_module):
+    """
+    Проверяет, что анонимная страница новости разрешена общим кешам:
+    без Vary: Cookie, без cookie в ответе и без CSRF-токена, а после
+    max-age её можно перепроверить по ETag.
+    """
+    settings.ROOT_URLCONF = urls_module
+    url = reverse('news:detail', args=(news.pk,))
+    response = client.get(url)
+    assert response.has_header('ETag')
+    revalidated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+    assert 'public' in revalidated['Cache-Control']
+    assert get_max_age(response) == settings.NEWS_DETAIL_MAX_AGE
+    assert 'public' in response['Cache-Control']
+    assert 'Cookie' not in response.get('Vary', '')
+    assert not response.cookies
+    assert 'csrfmiddlewaretoken' not in response.content.decode()
+
+
+def test_authorized_detail_page_is_private(author_client, news):
+    """
+    Проверяет, что страница с формой комментария зависит от cookie
+    и не попадает в общие кеши.
+    """
+    response = author_client.get(reverse('news:detail', args=(news.pk,)))
+    assert 'private' in response['Cache-Control']
+    assert 'Cookie' in response['Vary']
+    assert 'csrfmiddlewaretoken' in response.content.decode()
+
+
+def test_detail_page_with_stale_session_cookie(client, news, settings):
+    """
+    Проверяет, что с cookie несуществующей сессии страница
+    отдаётся без формы, но только в личный кеш.
+    """
+    client.cookies[settings.SESSION_COOKIE_NAME] = 'unknown'
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert 'form' not in response.context
+    assert 'private' in response['Cache-Control']
+
+
+@pytest.mark.parametrize('name', ('news:detail', 'news:edit', 'news:delete'))
+def test_pk_reverse_matches_reverse(name):
+    """Проверяет, что быстрый построитель ссылок совпадает с reverse()."""
+    for pk in (1, 42, 1234567):
+        assert pk_reverse(name, pk) == reverse(name, args=(pk,))
+
+
+def test_comment_fragment_is_cached_by_update_time(client, comment):
+    """
+    Проверяет, что отрисованный комментарий берётся из кеша фрагментов,
+    пока не изменилось время его правки.
+    """
+    url = reverse('news:detail', args=(comment.news_id,))
+    client.get(url)
+    Comment.objects.filter(pk=comment.pk).update(text='Тихая правка')
+    assert 'Тихая правка' not in client.get(url).content.decode()
+    comment.text = 'Обычная правка'
+    comment.save()
+    assert 'Обычная правка' in client.get(url).content.decode()
+
+
+def test_archive_pages_cover_all_news(client, settings, multiple_news):
+    """
+    Проверяет, что курсорные страницы архива выдают все новости
+    по порядку без повторов и каждая стоит одинаковое число запросов.
+    """
+    settings.ARCHIVE_PAGE_SIZE = 5
+    url = reverse('news:archive')
+    seen = []
+    query_counts = []
+    cursor = None
+    while True:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'after': cursor} if cursor else {})
+        query_counts.append(len(context.captured_queries))
+        seen.extend(news.pk for news in response.context['news_feed'])
+        cursor = response.context['next_cursor']
+        if cursor is None:
+            break
+    assert seen == list(News.objects.values_list('pk', flat=True))
+    assert len(query_counts) == 3
+    assert len(set(query_counts)) == 1
+
+
+def test_archive_month_bucket(client):
+    """
+    Проверяет, что страница месяца показывает только его новости,
+    а счётчики месяцев и лет берутся из сводной таблицы.
+    """
+    for day in (date(2020, 1, 5), date(2020, 1, 20), date(2020, 3, 1)):
+        News.objects.create(title=str(day), text='Текст', date=day)
+    response = client.get(reverse('news:archive_month', args=(2020, 1)))
+    assert [news.title for news in response.context['news_feed']] == [
+        '2020-01-20', '2020-01-05'
+    ]
+    (year, total, months), = response.context['years']
+    assert (year, total) == (2020, 3)
+    assert [(item.month, item.news_count) for item in months] == [
+        (3, 1), (1, 2)
+    ]
+
+
+@pytest.mark.parametrize(
+    'url, params, status',
+    (
+        ('/archive/2020/13/', {}, HTTPStatus.NOT_FOUND),
+        ('/archive/', {'after': 'испорчен'}, HTTPStatus.BAD_REQUEST),
+        ('/archive/', {'after': NULL_CURSOR}, HTTPStatus.BAD_REQUEST),
+    ),
+)
+def test_archive_rejects_bad_input(client, url, params, status):
+    """Проверяет ответы архива на несуществующий месяц и плохой курсор."""
+    assert client.get(url, params).status_code == status
@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='EXPLAIN QUERY PLAN есть только в SQLite.'
+    ),
+]
+
+
+def query_plans(client, url, table):
+    """
+    Запрашивает страницу и возвращает планы запросов к таблице table.
+
+    План каждого запроса склеивается в одну строку.
+    """
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if f'FROM "{table}"' not in query['sql']:
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plans.append(' | '.join(row[-1] for row in cursor.fetchall()))
+    return plans
+
+
+@pytest.mark.usefixtures('multiple_news')
+def test_news_list_uses_date_index(client):
+    """
+    Проверяет, что лента новостей читается по индексу (-date, -id).
+
+    Ожидается, что SQLite не сортирует таблицу новостей целиком.
+    """
+    plans = query_plans(client, reverse('news:home'), 'news_news')
+    assert plans
+    for plan in plans:
+        assert 'news_date_id_idx' in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+def test_news_detail_uses_comment_index(client, multiple_comments):
+    """
+    Проверяет, что комментарии новости читаются по индексу
+    (news_id, created) без отдельной сортировки.
+    """
+    url = reverse('news:detail', args=(multiple_comments[0].news_id,))
+    plans = query_plans(client, url, 'news_comment')
+    assert plans
+    for plan in plans:
+        assert 'comment_news_created_idx' in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.usefixtures('multiple_news')
+def test_archive_pages_use_date_index(client, settings):
+    """
+    Проверяет, что страницы архива, включая следующие по курсору
+    и страницы месяцев, читаются по индексу (-date, -id) без сортировки.
+    """
+    settings.ARCHIVE_PAGE_SIZE = 3
+    cursor = client.get(reverse('news:archive')).context['next_cursor']
+    today = date.today()
+    for url in (
+        reverse('news:archive') + f'?after={cursor}',
+        reverse('news:archive_month', args=(today.year, today.month)),
+    ):
+        plans = query_plans(client, url, 'news_news')
+        assert plans
+        for plan in plans:
+            assert 'news_date_id_idx' in plan
+            assert 'TEMP B-TREE' not in plan
@@ -1,11 +1,22 @@
+import gzip
+import logging
+import os
+import threading
+from datetime import date
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
+from django.db import OperationalError
 from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.comment_queue import CommentWriteQueue
+from news.models import ArchiveMonth, Comment, News
+from news.profanity import get_matcher
+from news.throttling import NO_REFILL_PERIOD, TokenBucket
 
 pytestmark = pytest.mark.django_db
 
@@ -63,6 +74,120 @@ def test_comment_with_bad_words_is_not_published(author_client, urls):
     assert response.context['form'].errors['text'] == [WARNING]
 
 
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Все они негодяи!',
+        'Опять ты со своей РЕДИСКОЙ',
+        'Негодяем был, им и остался',
+    )
+)
+def test_bad_word_forms_are_not_published(author_client, urls, news, text):
+    """
+    Проверяет, что запрещённые слова ловятся в любой словоформе.
+
+    Ожидается, что падеж, число и регистр не помогают обойти фильтр.
+    """
+    response = author_client.post(urls['detail'], data={'text': text})
+    assert not Comment.objects.exists()
+    assert response.context['form'].errors['text'] == [WARNING]
+
+
+def test_bad_words_file_is_reloaded(author_client, urls, news, settings,
+                                    tmp_path):
+    """
+    Проверяет, что список запрещённых слов подхватывается из файла
+    сразу после его изменения.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# Стоп-слова\nредиска\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    settings.BAD_WORDS_CHECK_INTERVAL = 0
+    author_client.post(urls['detail'], data={'text': 'Вот брокколи'})
+    assert Comment.objects.count() == 1
+    words_file.write_text('брокколи\n', encoding='utf-8')
+    mtime = words_file.stat().st_mtime_ns + 10 ** 9
+    os.utime(words_file, ns=(mtime, mtime))
+    response = author_client.post(urls['detail'],
+                                  data={'text': 'Вот брокколи'})
+    assert response.context['form'].errors['text'] == [WARNING]
+    assert Comment.objects.count() == 1
+
+
+def test_bad_words_file_is_checked_periodically(settings, tmp_path,
+                                                monkeypatch):
+    """
+    Проверяет, что время изменения файла слов проверяется не при
+    каждой проверке текста, а раз в BAD_WORDS_CHECK_INTERVAL секунд.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('редиска\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    settings.BAD_WORDS_CHECK_INTERVAL = 60
+    calls = []
+    stat = os.stat
+    monkeypatch.setattr(
+        'news.profanity.os.stat', lambda path: calls.append(path) or stat(path)
+    )
+    for _ in range(3):
+        assert get_matcher(BAD_WORDS).search('Вот редиска')
+    assert len(calls) == 1
+
+
+def test_missing_bad_words_file_keeps_last_list(settings, tmp_path, caplog,
+                                                monkeypatch):
+    """
+    Проверяет, что пропавший файл слов не ломает проверку:
+    остаётся последний список из файла, а без него - список
+    по умолчанию, и в лог пишется предупреждение.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('брокколи\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    settings.BAD_WORDS_CHECK_INTERVAL = 0
+    assert get_matcher(BAD_WORDS).search('Вот брокколи')
+    words_file.unlink()
+    with caplog.at_level(logging.WARNING, logger='news.profanity'):
+        assert get_matcher(BAD_WORDS).search('Вот брокколи')
+    assert caplog.records
+    # Новый процесс: собранного из файла матчера ещё нет.
+    monkeypatch.setattr('news.profanity._matcher', (None, None))
+    assert get_matcher(BAD_WORDS).search(f'Ты {BAD_WORDS[0]}')
+
+
+def test_bad_words_file_reload_is_thread_safe(settings, tmp_path):
+    """
+    Проверяет, что параллельные проверки текста во время смены
+    файла слов не падают и всегда получают рабочий матчер.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('редиска\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    settings.BAD_WORDS_CHECK_INTERVAL = 0
+    errors = []
+
+    def check():
+        try:
+            for _ in range(200):
+                get_matcher(BAD_WORDS).search('Вот редиска')
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=check) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for index in range(50):
+        mtime = words_file.stat().st_mtime_ns + 10 ** 9
+        os.utime(words_file, ns=(mtime, mtime))
+        if index % 10 == 0:
+            words_file.unlink()
+            words_file.write_text('редиска\n', encoding='utf-8')
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert get_matcher(BAD_WORDS).search('Вот редиска')
+
+
 def test_only_author_can_edit_comment(author_client, comment, urls):
     """
     Проверяет, что только автор комментария может его редактировать.
@@ -121,3 +246,263 @@ def test_user_cannot_delete_other_comment(not_author_client, comment, urls):
     response = not_author_client.post(urls['delete'])
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.filter(pk=comment.pk).exists()
+
+
+def test_comment_count_follows_create_and_delete(author_client, form_data,
+                                                 news, urls):
+    """
+    Проверяет, что счётчик комментариев новости поддерживается актуальным.
+
+    Ожидается, что после публикации комментария счётчик вырастет на единицу,
+    а после его удаления вернётся к нулю.
+    """
+    author_client.post(urls['detail'], data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=[comment.pk]))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_burst_is_throttled(author_client, form_data, urls,
+                                    settings):
+    """
+    Проверяет, что сверх лимита комментарии не принимаются:
+    сервер отвечает 429 с Retry-After и ничего не сохраняет.
+    """
+    settings.COMMENT_THROTTLE_BURST = 2
+    settings.COMMENT_THROTTLE_PER_MINUTE = 1
+    for _ in range(2):
+        assert author_client.post(
+            urls['detail'], data=form_data
+        ).status_code == HTTPStatus.FOUND
+    response = author_client.post(urls['detail'], data=form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert 1 <= int(response['Retry-After']) <= 60
+    assert Comment.objects.count() == 2
+
+
+def test_comment_throttle_counts_accounts_from_one_address(
+        author_client, not_author_client, form_data, urls, settings):
+    """
+    Проверяет, что второй аккаунт с того же IP-адреса не получает
+    свой лимит: корзина адреса общая для всех его пользователей.
+    """
+    settings.COMMENT_THROTTLE_BURST = 2
+    settings.COMMENT_THROTTLE_PER_MINUTE = 1
+    for _ in range(2):
+        assert author_client.post(
+            urls['detail'], data=form_data
+        ).status_code == HTTPStatus.FOUND
+    response = not_author_client.post(urls['detail'], data=form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    response = not_author_client.post(
+        urls['detail'], data=form_data, REMOTE_ADDR='10.0.0.2'
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.count() == 3
+
+
+def test_token_bucket_refills_over_time():
+    """Проверяет, что корзина пополняется со временем, но не сверх ёмкости."""
+    now = [0.0]
+    bucket = TokenBucket('test-bucket', 2, 0.5, clock=lambda: now[0])
+    assert [bucket.consume() for _ in range(3)] == [0, 0, 2]
+    now[0] += 2
+    assert bucket.consume() == 0
+    now[0] += 100
+    assert [bucket.consume() for _ in range(3)] == [0, 0, 2]
+
+
+def test_token_bucket_without_refill():
+    """
+    Проверяет, что при нулевой скорости корзина не делит на ноль,
+    а выдаёт capacity жетонов за период без пополнения.
+    """
+    now = [0.0]
+    bucket = TokenBucket('test-bucket', 2, 0, clock=lambda: now[0])
+    assert [bucket.consume() for _ in range(3)] == [0, 0, NO_REFILL_PERIOD]
+    now[0] += NO_REFILL_PERIOD
+    assert bucket.consume() == 0
+
+
+def test_comments_throttled_without_refill(author_client, form_data, urls,
+                                           settings):
+    """Проверяет, что нулевой COMMENT_THROTTLE_PER_MINUTE даёт 429."""
+    settings.COMMENT_THROTTLE_BURST = 1
+    settings.COMMENT_THROTTLE_PER_MINUTE = 0
+    author_client.post(urls['detail'], data=form_data)
+    response = author_client.post(urls['detail'], data=form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) == NO_REFILL_PERIOD
+
+
+def test_queued_comments_are_written_in_batches(author_client, form_data,
+                                                news, urls, monkeypatch,
+                                                settings):
+    """
+    Проверяет режим очереди: комментарии не пишутся в запросе,
+    а сохраняются пачками вместе со счётчиком новости.
+    """
+    settings.COMMENT_WRITE_QUEUE = True
+    queue = CommentWriteQueue(batch_size=2, interval=None)
+    monkeypatch.setattr('news.views.get_comment_queue', lambda: queue)
+    for _ in range(3):
+        author_client.post(urls['detail'], data=form_data)
+    assert len(queue) == 3
+    assert not Comment.objects.exists()
+    assert queue.flush() == 3
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.count() == 3
+
+
+def test_queue_keeps_comments_when_database_is_busy(author, news,
+                                                    monkeypatch):
+    """
+    Проверяет, что при занятой базе комментарии остаются в очереди
+    и записываются следующей попыткой.
+    """
+    queue = CommentWriteQueue(batch_size=2, interval=None)
+    for index in range(3):
+        queue.put(Comment(news=news, author=author, text=f'Текст {index}'))
+    bulk_create = Comment.objects.bulk_create
+
+    def locked(objs, *args, **kwargs):
+        raise OperationalError('database is locked')
+
+    monkeypatch.setattr(Comment.objects, 'bulk_create', locked)
+    with pytest.raises(OperationalError):
+        queue.flush()
+    assert len(queue) == 3
+    monkeypatch.setattr(Comment.objects, 'bulk_create', bulk_create)
+    assert queue.flush() == 3
+    assert Comment.objects.count() == 3
+
+
+def test_queue_logs_rejected_comment(author, news, caplog):
+    """
+    Проверяет, что комментарий, который отвергла база, попадает
+    в лог, а остальные комментарии пачки записываются.
+    """
+    queue = CommentWriteQueue(batch_size=10, interval=None)
+    queue.put(Comment(news=news, author=author, text='Хороший'))
+    queue.put(Comment(news=news, author=author, text=None))
+    with caplog.at_level(logging.ERROR, logger='news.comment_queue'):
+        assert queue.flush() == 1
+    assert Comment.objects.get().text == 'Хороший'
+    record, = caplog.records
+    assert 'отброшен' in record.getMessage()
+
+
+def test_comment_count_follows_bulk_operations(multiple_comments):
+    """
+    Проверяет счётчик комментариев при массовых операциях.
+
+    bulk_create() и удаление через QuerySet не вызывают save() и delete()
+    у объектов, но счётчик всё равно должен совпадать с числом комментариев.
+    """
+    news = News.objects.get(pk=multiple_comments[0].news_id)
+    assert news.comment_count == len(multiple_comments)
+    first_two = Comment.objects.values_list('pk', flat=True)[:2]
+    Comment.objects.filter(pk__in=list(first_two)).delete()
+    news.refresh_from_db()
+    assert news.comment_count == len(multiple_comments) - 2
+
+
+def test_recount_comments_command(comment, news):
+    """
+    Проверяет, что команда recount_comments восстанавливает счётчики.
+
+    Испорченный вручную счётчик должен совпасть с реальным
+    числом комментариев после запуска команды.
+    """
+    News.objects.filter(pk=news.pk).update(comment_count=42)
+    output = StringIO()
+    call_command('recount_comments', stdout=output)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert 'Пересчитано новостей: 1' in output.getvalue()
+
+
+def archive_counts():
+    return dict(ArchiveMonth.objects.filter(news_count__gt=0).values_list(
+        'month', 'news_count'
+    ))
+
+
+def test_archive_counts_follow_news_changes():
+    """
+    Проверяет, что счётчики архива меняются при создании, переносе
+    в другой месяц, удалении и массовом создании новостей, а команда
+    rebuild_archive восстанавливает их после update() в обход сигналов.
+    """
+    news = News.objects.create(title='Н', text='Т', date=date(2021, 5, 1))
+    assert archive_counts() == {5: 1}
+    news = News.objects.get(pk=news.pk)
+    news.date = date(2021, 6, 1)
+    news.save()
+    assert archive_counts() == {6: 1}
+    News.objects.bulk_create([
+        News(title=str(day), text='Т', date=date(2021, 6, day))
+        for day in (2, 3)
+    ])
+    assert archive_counts() == {6: 3}
+    news.delete()
+    assert archive_counts() == {6: 2}
+    News.objects.update(date=date(2021, 7, 1))
+    output = StringIO()
+    call_command('rebuild_archive', stdout=output)
+    assert archive_counts() == {7: 2}
+    assert 'Месяцев в архиве: 1' in output.getvalue()
+
+
+def test_summary_is_filled_on_save_and_bulk_create():
+    """
+    Проверяет, что анонс строится из первых 15 слов текста
+    и при обычном, и при массовом создании новостей.
+    """
+    text = ' '.join(f'слово{index}' for index in range(30))
+    expected = ' '.join(f'слово{index}' for index in range(15)) + '…'
+    single = News.objects.create(title='Одна', text=text)
+    News.objects.bulk_create([News(title='Много', text=text)])
+    assert single.summary == expected
+    assert News.objects.get(title='Много').summary == expected
+
+
+def test_fill_summaries_command(news):
+    """Проверяет, что команда fill_summaries восстанавливает анонсы."""
+    News.objects.update(summary='')
+    output = StringIO()
+    call_command('fill_summaries', '--batch-size', '1', stdout=output)
+    news.refresh_from_db()
+    assert news.summary == news.text
+    assert 'Обновлено анонсов: 1' in output.getvalue()
+
+
+@pytest.mark.usefixtures('news', 'old_and_new_news')
+def test_export_streams_gzipped_csv_for_staff(client, author):
+    """
+    Проверяет, что сотрудник получает потоковую сжатую выгрузку
+    новостей в CSV с фильтром по дате.
+    """
+    author.is_staff = True
+    author.save()
+    client.force_login(author)
+    response = client.get(reverse('news:export'), {
+        'kind': 'news',
+        'format': 'csv',
+        'date_from': date.today().isoformat(),
+    })
+    assert response.streaming
+    lines = gzip.decompress(
+        b''.join(response.streaming_content)
+    ).decode().splitlines()
+    assert lines[0] == 'id,title,text,date,comment_count'
+    assert len(lines) == 3
+
+
+def test_export_is_forbidden_for_regular_users(author_client):
+    """Проверяет, что обычный пользователь не может выгрузить данные."""
+    response = author_client.get(reverse('news:export'), {'kind': 'news'})
+    assert response.status_code == HTTPStatus.FORBIDDEN
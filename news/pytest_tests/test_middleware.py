@@ -0,0 +1,130 @@
+import gzip
+import logging
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def instrumented_client(settings):
+    """Клиент, для которого включены замеры запросов."""
+    settings.PERF_INSTRUMENTATION = True
+    return Client()
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    """Статика, собранная хранилищем со сжатыми копиями."""
+    settings.STATIC_ROOT = str(tmp_path)
+    settings.STATICFILES_STORAGE = (
+        'yanews.storage.CompressedManifestStaticFilesStorage'
+    )
+    settings.STATIC_SERVE = True
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_instrumentation_is_off_by_default(client, news):
+    """Проверяет, что без настройки заголовок Server-Timing не выдаётся."""
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert 'Server-Timing' not in response
+
+
+def test_server_timing_header(instrumented_client, news):
+    """
+    Проверяет, что в ответе есть время SQL с числом запросов,
+    время шаблона и общее время.
+    """
+    response = instrumented_client.get(reverse('news:detail', args=(news.pk,)))
+    timing = response['Server-Timing']
+    assert 'desc="3 queries"' in timing
+    for metric in ('db;dur=', 'tpl;dur=', 'total;dur='):
+        assert metric in timing
+
+
+def test_request_over_budget_is_logged(instrumented_client, news, settings,
+                                       caplog):
+    """
+    Проверяет, что запрос сверх бюджета попадает в лог
+    с уровнем WARNING и структурированными данными.
+    """
+    settings.PERF_QUERY_BUDGET = 1
+    with caplog.at_level(logging.INFO, logger='yanews.performance'):
+        instrumented_client.get(reverse('news:detail', args=(news.pk,)))
+    record, = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.performance['queries'] == 3
+    assert record.performance['over_budget'] is True
+
+
+def test_html_is_gzipped_above_threshold(client, news, settings):
+    """Проверяет, что страница больше порога сжимается gzip."""
+    settings.GZIP_MIN_LENGTH = 100
+    url = reverse('news:detail', args=(news.pk,))
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert b'<html' in gzip.decompress(response.content)
+    assert 'Content-Encoding' not in client.get(url)
+
+
+def test_short_response_is_not_gzipped(client, news, settings):
+    """Проверяет, что ответ короче порога отдаётся как есть."""
+    settings.GZIP_MIN_LENGTH = 10 ** 6
+    response = client.get(
+        reverse('news:detail', args=(news.pk,)), HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert 'Content-Encoding' not in response
+
+
+@pytest.mark.usefixtures('news')
+def test_compressed_export_is_not_gzipped_again(client, author):
+    """Проверяет, что уже сжатая выгрузка не сжимается повторно."""
+    author.is_staff = True
+    author.save()
+    client.force_login(author)
+    response = client.get(
+        reverse('news:export'), {'kind': 'news'}, HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert 'Content-Encoding' not in response
+    gzip.decompress(b''.join(response.streaming_content))
+
+
+def test_collectstatic_writes_gzipped_copies(collected_static):
+    """
+    Проверяет, что collectstatic кладёт рядом с файлом с хешем в имени
+    его сжатую копию.
+    """
+    name = staticfiles_storage.stored_name('news/css/news.css')
+    assert name != 'news/css/news.css'
+    assert gzip.decompress(
+        (collected_static / f'{name}.gz').read_bytes()
+    ) == (collected_static / name).read_bytes()
+
+
+def test_static_is_served_precompressed(client, collected_static):
+    """
+    Проверяет, что статика с хешем отдаётся из сжатой копии
+    и кешируется браузером надолго.
+    """
+    url = staticfiles_storage.url('news/css/news.css')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain
+    assert gzip.decompress(
+        b''.join(response.streaming_content)
+    ) == b''.join(plain.streaming_content)
+
+
+@pytest.mark.usefixtures('collected_static')
+def test_static_outside_root_is_not_served(client):
+    """Проверяет, что путь за пределами STATIC_ROOT не отдаётся."""
+    response = client.get('/static/../../etc/passwd')
+    assert response.status_code == 404
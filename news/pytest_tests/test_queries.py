@@ -0,0 +1,155 @@
+import pytest
+from django.conf import settings as django_settings
+from django.test import Client
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+# Сессия и пользователь загружаются middleware при запросе
+# авторизованного клиента, пока их нет в кеше.
+AUTH = 2
+# ETag и время изменения страницы для условного GET.
+STATE = 1
+
+
+@pytest.mark.parametrize(
+    'client_name, name, arg, expected',
+    (
+        ('client', 'news:home', None, STATE + 1),
+        ('author_client', 'news:home', None, AUTH + STATE + 1),
+        ('client', 'news:detail', 'news_id', STATE + 2),
+        ('author_client', 'news:detail', 'news_id', AUTH + STATE + 2),
+        ('client', 'news:comments', 'news_id', 1),
+        ('author_client', 'news:edit', 'pk', AUTH + 1),
+        ('author_client', 'news:delete', 'pk', AUTH + 1),
+    )
+)
+def test_get_query_count(request, client_name, name, arg, expected,
+                         comment, django_assert_num_queries):
+    """
+    Проверяет точное количество SQL-запросов при открытии страниц.
+
+    Лента анонимного пользователя запрашивается с холодным кешем.
+    """
+    client = request.getfixturevalue(client_name)
+    args = [getattr(comment, arg)] if arg else None
+    url = reverse(name, args=args)
+    with django_assert_num_queries(expected):
+        client.get(url)
+
+
+def test_create_comment_query_count(author_client, news, form_data,
+                                    django_assert_num_queries):
+    """
+    Публикация комментария: новость, вставка комментария
+    и обновление счётчика без повторной загрузки новости.
+    """
+    url = reverse('news:detail', args=[news.pk])
+    with django_assert_num_queries(AUTH + 3):
+        author_client.post(url, data=form_data)
+
+
+def test_edit_comment_query_count(author_client, comment, form_data,
+                                  django_assert_num_queries):
+    """
+    Редактирование комментария: загрузка, сохранение и отметка
+    новости изменённой; адрес редиректа строится без обращения к базе.
+    """
+    url = reverse('news:edit', args=[comment.pk])
+    with django_assert_num_queries(AUTH + 3):
+        author_client.post(url, data=form_data)
+
+
+def test_delete_comment_query_count(author_client, comment,
+                                    django_assert_num_queries):
+    """
+    Удаление комментария: загрузка, удаление и обновление счётчика,
+    адрес редиректа строится без обращения к базе.
+    """
+    url = reverse('news:delete', args=[comment.pk])
+    with django_assert_num_queries(AUTH + 3):
+        author_client.post(url)
+
+
+@pytest.mark.usefixtures('news')
+def test_home_page_does_not_load_news_text(author_client,
+                                           django_assert_num_queries):
+    """Проверяет, что лента читает анонсы, а не полные тексты новостей."""
+    with django_assert_num_queries(AUTH + STATE + 1) as context:
+        author_client.get(reverse('news:home'))
+    feed_sql = context.captured_queries[-1]['sql']
+    assert '"summary"' in feed_sql
+    assert '"news_news"."text"' not in feed_sql
+
+
+def test_comment_list_loads_only_author_name(author_client, comment,
+                                             django_assert_num_queries):
+    """
+    Проверяет, что список комментариев читает из таблицы пользователей
+    только id и имя автора, а владение проверяется без лишних запросов.
+    """
+    url = reverse('news:detail', args=(comment.news_id,))
+    with django_assert_num_queries(AUTH + STATE + 2) as context:
+        response = author_client.get(url)
+    comments_sql = context.captured_queries[-1]['sql']
+    assert '"auth_user"."username"' in comments_sql
+    assert '"auth_user"."password"' not in comments_sql
+    assert '"auth_user"."email"' not in comments_sql
+    assert reverse('news:edit', args=(comment.pk,)) in (
+        response.content.decode()
+    )
+
+
+@pytest.mark.parametrize('backend', ('cached_db', 'signed_cookies'))
+@pytest.mark.usefixtures('news')
+def test_home_page_with_warm_auth_cache(backend, author, settings,
+                                        django_assert_num_queries):
+    """
+    Проверяет, что с сессией в кеше или в cookie и пользователем
+    в кеше лента авторизованного пользователя не обращается
+    к таблицам сессий и пользователей.
+    """
+    settings.SESSION_ENGINE = settings.SESSION_BACKENDS[backend]
+    settings.USER_CACHE_TIMEOUT = 60
+    client = Client()
+    client.force_login(author)
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(STATE + 1):
+        client.get(url)
+
+
+@pytest.mark.skipif(
+    django_settings.CACHE_BACKEND != 'locmem', reason='Кеш не locmem.'
+)
+@pytest.mark.usefixtures('news')
+def test_user_cache_is_off_with_local_cache(author_client, settings,
+                                            django_assert_num_queries):
+    """
+    Проверяет, что с кешем locmem по умолчанию пользователь
+    загружается из базы в каждом запросе.
+    """
+    assert settings.USER_CACHE_TIMEOUT == 0
+    url = reverse('news:home')
+    author_client.get(url)
+    with django_assert_num_queries(AUTH + STATE + 1):
+        author_client.get(url)
+
+
+@pytest.mark.usefixtures('news')
+def test_changed_user_is_reloaded(author_client, author, settings,
+                                  django_assert_num_queries):
+    """
+    Проверяет, что после сохранения пользователя он снова
+    загружается из базы, а не берётся из кеша.
+    """
+    settings.USER_CACHE_TIMEOUT = 60
+    url = reverse('news:home')
+    author_client.get(url)
+    # Сессия по умолчанию хранится в базе, пользователь - в кеше.
+    with django_assert_num_queries(1 + STATE + 1):
+        author_client.get(url)
+    author.first_name = 'Иван'
+    author.save()
+    with django_assert_num_queries(AUTH + STATE + 1):
+        author_client.get(url)
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from news.models import News
+from yanews.db import copy_sqlite
+from yanews.middleware import ReplicaPinMiddleware
+from yanews.routers import REPLICA_PIN_COOKIE, ReplicaRouter
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica0']
+
+
+@pytest.mark.usefixtures('replicas')
+@pytest.mark.parametrize(
+    'method, cookies, expected',
+    (
+        ('get', {}, 'replica0'),
+        ('get', {REPLICA_PIN_COOKIE: '1'}, 'default'),
+        ('post', {}, 'default'),
+    ),
+)
+def test_reads_are_pinned_to_primary_after_writes(method, cookies,
+                                                  expected):
+    """
+    Проверяет, что чтения идут на реплику, кроме запросов на запись
+    и запросов с cookie привязки, и что запись ставит эту cookie.
+    """
+    request = getattr(RequestFactory(), method)('/')
+    request.COOKIES.update(cookies)
+    used = []
+
+    def get_response(request):
+        used.append(ReplicaRouter().db_for_read(News))
+        return HttpResponse()
+
+    response = ReplicaPinMiddleware(get_response)(request)
+    assert used == [expected]
+    assert (REPLICA_PIN_COOKIE in response.cookies) == (method == 'post')
+    assert ReplicaRouter().db_for_read(News) == 'replica0'
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('replicas', 'news')
+@pytest.mark.parametrize('urls_module', ('yanews.urls', 'yanews.async_urls'))
+def test_feed_cache_is_filled_from_primary(client, monkeypatch, settings,
+                                           urls_module):
+    """
+    Проверяет, что ленту для кеша анонимных пользователей читают
+    из основной базы: отставшая реплика не попадёт в кеш.
+    """
+    settings.ROOT_URLCONF = urls_module
+    used = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        used.append(db_for_read(self, model, **hints))
+        return 'default'
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    # Тест идёт в транзакции, а в ней роутер и так читает из основной.
+    monkeypatch.setattr(connection, 'in_atomic_block', False)
+    client.get(reverse('news:home'))
+    assert used
+    assert set(used) == {'default'}
+
+
+def test_writes_and_migrations_go_to_primary(replicas):
+    """Проверяет, что запись и миграции не попадают на реплики."""
+    router = ReplicaRouter()
+    assert router.db_for_write(News) == 'default'
+    assert router.allow_migrate('default', 'news')
+    assert not router.allow_migrate('replica0', 'news')
+
+
+def test_copy_sqlite_replaces_replica(tmp_path):
+    """Проверяет, что копия базы целиком заменяет устаревшую реплику."""
+    primary = sqlite3.connect(tmp_path / 'primary.sqlite3')
+    replica = sqlite3.connect(tmp_path / 'replica.sqlite3')
+    replica.execute('CREATE TABLE stale (id INTEGER)')
+    primary.execute('CREATE TABLE news (title TEXT)')
+    primary.executemany(
+        'INSERT INTO news VALUES (?)', [(str(index),) for index in range(50)]
+    )
+    primary.commit()
+    copy_sqlite(primary, replica, pages=1)
+    tables = replica.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    ).fetchall()
+    assert tables == [('news',)]
+    assert replica.execute('SELECT count(*) FROM news').fetchone() == (50,)
@@ -97,3 +97,10 @@ def test_pages_availability_for_anonymous_user(client, name):
     url = reverse(name)
     response = client.get(url)
     assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize('params', ({}, {'format': 'json'}))
+def test_comments_of_missing_news_not_found(client, params):
+    """Проверяет, что комментарии несуществующей новости дают 404."""
+    url = reverse('news:comments', args=(0,))
+    assert client.get(url, params).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.models import News
+from news.search import search_news
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Индекс FTS5 есть в SQLite.'
+    ),
+]
+
+
+@pytest.fixture
+def searchable_news():
+    """Фикстура с новостями, в которых слово встречается по-разному."""
+    return [
+        News.objects.create(
+            title='Обычный день', text='В тексте упомянут негодяй.'
+        ),
+        News.objects.create(
+            title='Негодяи пойманы', text='Полиция задержала всех.'
+        ),
+        News.objects.create(title='Погода', text='Солнечно и тепло.'),
+    ]
+
+
+def test_search_finds_word_forms_ranked_by_relevance(searchable_news):
+    """
+    Проверяет, что поиск находит другие формы слова и ставит
+    совпадение в заголовке выше совпадения в тексте.
+    """
+    results = search_news('негодяем')
+    assert [news.pk for news in results] == [
+        searchable_news[1].pk, searchable_news[0].pk
+    ]
+
+
+def test_search_snippet_is_escaped_and_highlighted():
+    """Проверяет, что сниппет экранирован, а найденное слово выделено."""
+    News.objects.create(title='Заголовок', text='<script>редиска</script>')
+    news, = search_news('редиски')
+    assert news.snippet == (
+        '&lt;script&gt;<mark>редиска</mark>&lt;/script&gt;'
+    )
+
+
+def test_search_index_follows_updates_and_deletes(searchable_news):
+    """Проверяет, что триггеры обновляют индекс при изменении новостей."""
+    weather = searchable_news[2]
+    weather.text = 'Ожидается ураган.'
+    weather.save()
+    assert [news.pk for news in search_news('ураган')] == [weather.pk]
+    assert search_news('солнечно') == []
+    weather.delete()
+    assert search_news('ураган') == []
+
+
+def test_search_page_and_api(client, searchable_news):
+    """Проверяет HTML-страницу поиска и JSON API."""
+    response = client.get(reverse('news:search'), {'q': 'погоды'})
+    assert list(response.context['results']) == [searchable_news[2]]
+    data = client.get(reverse('news:search_api'), {'q': 'погоды'}).json()
+    assert [item['id'] for item in data['results']] == [
+        searchable_news[2].pk
+    ]
+    assert client.get(reverse('news:search'), {'q': '"*'}).status_code == 200
+
+
+def test_rebuild_search_index(searchable_news):
+    """Проверяет, что команда восстанавливает рассинхронизированный индекс."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO news_news_fts(news_news_fts) VALUES ('delete-all')"
+        )
+    assert search_news('погода') == []
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert len(search_news('погода')) == 1
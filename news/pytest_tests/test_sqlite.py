@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.db import connection, connections
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Настройки только для SQLite.'
+)
+
+
+@pytest.mark.django_db
+def test_pragmas_are_applied_to_new_connections(settings):
+    """
+    Проверяет, что PRAGMA из настроек применяются
+    к каждому новому соединению с базой.
+    """
+    settings.SQLITE_PRAGMAS = {'busy_timeout': 1234, 'cache_size': -2048}
+    new_connection = connections.create_connection('default')
+    try:
+        with new_connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 1234
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] == -2048
+    finally:
+        new_connection.close()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('mode', ((), ('--queued',)))
+def test_concurrent_comments_do_not_lock_database(mode):
+    """
+    Проверяет, что с профилем SQLITE_TUNED комментарии из многих
+    потоков сохраняются без ошибок «database is locked»,
+    в том числе при записи пачками через очередь.
+
+    Нагрузка запускается отдельным процессом на файловой базе:
+    в общей базе тестов в памяти блокировки устроены иначе.
+    """
+    result = subprocess.run(
+        (
+            sys.executable, 'manage.py', 'stress_comments',
+            '--threads', '8', '--comments', '10', *mode,
+        ),
+        cwd=django_settings.BASE_DIR,
+        env={**os.environ, 'SQLITE_TUNED': '1'},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert 'ошибок блокировки: 0' in result.stdout
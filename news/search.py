@@ -0,0 +1,168 @@
+"""
+Полнотекстовый поиск по новостям на SQLite FTS5.
+
+Индекс news_news_fts хранит только токены (external content), сами
+тексты берутся из news_news. Индекс поддерживается триггерами.
+FTS5 не умеет в русскую морфологию, поэтому слова запроса сводятся
+к основам (news.text.stem) и ищутся как префиксы: «негодяи» найдёт
+и «негодяй», и «негодяем».
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+from .text import stem
+
+FTS_TABLE = 'news_news_fts'
+
+CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, text,
+    content='news_news', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3 4 5'
+)
+"""
+
+# Заголовок весит больше текста. Сортировка по встроенному столбцу
+# rank позволяет FTS5 не вычислять bm25() отдельно для каждой строки.
+CONFIGURE_RANK = f"""
+INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')
+"""
+
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON news_news BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON news_news BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER {FTS_TABLE}_update
+        AFTER UPDATE OF title, text ON news_news BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    """,
+}
+
+# Служебные символы, которыми FTS5 отмечает найденное в сниппете.
+# Текст сниппета экранируется, и только потом они меняются на <mark>.
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+
+SEARCH_SQL = f"""
+SELECT news_news.id, news_news.title, news_news.date,
+       snippet({FTS_TABLE}, 1, %s, %s, '…', {SNIPPET_TOKENS}) AS snippet,
+       {FTS_TABLE}.rank AS rank
+FROM {FTS_TABLE}
+JOIN news_news ON news_news.id = {FTS_TABLE}.rowid
+WHERE {FTS_TABLE} MATCH %s
+ORDER BY {FTS_TABLE}.rank
+LIMIT %s
+"""
+
+
+def is_supported(using_connection=connection):
+    return using_connection.vendor == 'sqlite'
+
+
+def install(using_connection=connection):
+    """
+    Создаёт индекс и недостающие триггеры.
+
+    SQLite при изменении схемы пересоздаёт таблицу news_news, и её
+    триггеры пропадают, поэтому функция вызывается после каждой
+    миграции. Если триггеры пришлось создавать заново, индекс
+    перестраивается: изменения без триггеров в него не попали.
+    Возвращает True, если индекс был перестроен.
+    """
+    if not is_supported(using_connection):
+        return False
+    with using_connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE)
+        cursor.execute(CONFIGURE_RANK)
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+    if missing:
+        rebuild(using_connection)
+    return bool(missing)
+
+
+def rebuild(using_connection=connection):
+    """Перестраивает индекс по текущему содержимому news_news."""
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский запрос в выражение MATCH.
+
+    Каждое слово сводится к основе и ищется как префикс, все слова
+    должны встретиться в новости. Кавычки защищают от синтаксиса FTS5.
+    """
+    terms = []
+    for word in re.findall(r'\w+', text):
+        term = stem(word).replace('"', '""')
+        terms.append(f'"{term}"*')
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    """Экранирует сниппет и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search_news(text, limit=20):
+    """
+    Ищет новости и возвращает их в порядке релевантности.
+
+    У каждой новости есть атрибуты snippet (безопасный HTML
+    с подсветкой) и rank. На других СУБД выполняется простой
+    поиск по вхождению подстроки без ранжирования.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+    if not is_supported():
+        results = list(News.objects.filter(
+            Q(title__icontains=text) | Q(text__icontains=text)
+        ).only('id', 'title', 'date', 'text')[:limit])
+        for news in results:
+            news.snippet = escape(news.text[:200])
+            news.rank = 0
+        return results
+    results = list(News.objects.raw(
+        SEARCH_SQL, [MARK_START, MARK_END, match, limit]
+    ))
+    for news in results:
+        news.snippet = highlight(news.snippet)
+    return results
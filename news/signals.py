@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_feed_version
+from .models import ArchiveMonth, Comment, News, month_of
+
+
+@receiver(post_save, sender=Comment)
+def update_news_on_comment_save(sender, instance, created, **kwargs):
+    """
+    Новый комментарий увеличивает счётчик у новости.
+
+    Правка комментария тоже меняет страницу новости,
+    поэтому обновляем и её время изменения. loaddata (raw) счётчики
+    не трогает: после загрузки их пересчитывает recount_comments.
+    """
+    if kwargs.get('raw'):
+        return
+    news = News.objects.filter(pk=instance.news_id)
+    if created:
+        news.change_comment_count(1)
+    else:
+        news.touch()
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Удалённый комментарий уменьшает счётчик у новости."""
+    News.objects.filter(pk=instance.news_id).change_comment_count(-1)
+
+
+@receiver(post_save, sender=News)
+def update_archive_on_news_save(sender, instance, created, **kwargs):
+    """
+    Новая новость или смена её месяца меняют счётчики архива.
+
+    После loaddata (raw) архив строит команда rebuild_archive.
+    """
+    if kwargs.get('raw'):
+        return
+    new = month_of(instance.date)
+    old = getattr(instance, 'loaded_date', None)
+    if created:
+        ArchiveMonth.objects.shift({new: 1})
+    elif old is not None and month_of(old) != new:
+        ArchiveMonth.objects.shift({new: 1, month_of(old): -1})
+    instance.loaded_date = instance.date
+
+
+@receiver(post_delete, sender=News)
+def update_archive_on_news_delete(sender, instance, **kwargs):
+    ArchiveMonth.objects.shift({month_of(instance.date): -1})
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_feed(sender, **kwargs):
+    """
+    Любое изменение новостей или комментариев меняет версию ленты.
+
+    Версию меняем после коммита: иначе параллельный запрос успеет
+    закешировать ленту со старыми данными под новой версией.
+    """
+    transaction.on_commit(bump_feed_version, using=kwargs.get('using'))
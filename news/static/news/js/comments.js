@@ -0,0 +1,18 @@
+// Кнопка «Показать ещё»: подгружает следующую страницу комментариев
+// HTML-фрагментом и заменяет им саму кнопку.
+(function () {
+  var list = document.getElementById('comment-list');
+  if (!list) {
+    return;
+  }
+  list.addEventListener('click', function (event) {
+    var link = event.target.closest('.load-more');
+    if (!link) {
+      return;
+    }
+    event.preventDefault();
+    fetch(link.href)
+      .then(function (response) { return response.text(); })
+      .then(function (html) { link.outerHTML = html; });
+  });
+})();
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 
 # Импортируем функцию reverse(), она понадобится для получения адреса страницы.
@@ -34,6 +35,11 @@ class TestHomePage(TestCase):
         ]
         News.objects.bulk_create(all_news) 
 
+    def setUp(self):
+        # Анонимная лента кешируется, а кеш не откатывается вместе с базой.
+        # Очищаем его, чтобы каждый тест получил свежую страницу с контекстом.
+        cache.clear()
+
     def test_news_count(self):
         # Загружаем главную страницу.
         response = self.client.get(self.HOME_URL)
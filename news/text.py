@@ -0,0 +1,47 @@
+"""Простые операции над русским текстом."""
+from django.utils.text import Truncator
+
+# Окончания отсортированы по убыванию длины: отрезаем самое длинное.
+ENDINGS = (
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой', 'ей',
+    'ом', 'ем', 'ах', 'ях', 'ам', 'ям', 'ов', 'ев',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+)
+MIN_STEM_LENGTH = 4
+# Анонс новости на главной: столько слов, но не длиннее колонки.
+SUMMARY_WORDS = 15
+SUMMARY_LENGTH = 255
+
+
+def normalize(text):
+    """Приводит текст к нижнему регистру и заменяет «ё» на «е»."""
+    return text.lower().replace('ё', 'е')
+
+
+def stem(word):
+    """
+    Отрезает от слова окончание, оставляя основу.
+
+    Это не полноценный стеммер, а грубое приближение: его достаточно,
+    чтобы «негодяй», «негодяя» и «негодяем» сводились к одной основе.
+    Слишком короткие основы не выделяем, чтобы не ловить лишнее.
+    """
+    word = normalize(word.strip())
+    for ending in ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def summarize(text, words=SUMMARY_WORDS, length=SUMMARY_LENGTH):
+    """
+    Возвращает анонс: первые words слов текста.
+
+    Результат дополнительно обрезается до length символов, чтобы
+    поместиться в колонку даже при очень длинных словах.
+    """
+    return Truncator(Truncator(text).words(words)).chars(length)
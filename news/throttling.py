@@ -0,0 +1,103 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket.
+
+У каждого клиента своя корзина на capacity жетонов, которая пополняется
+со скоростью rate жетонов в секунду. Запрос забирает жетон; если жетонов
+нет, клиенту сообщается, через сколько секунд появится следующий.
+
+Состояние корзины хранится в кеше Django, поэтому при общем кеше оно
+общее для всех процессов. Чтение и запись не атомарны: при гонке клиент
+может получить лишний жетон, для защиты от всплесков этого достаточно.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+THROTTLE_KEY = 'news:throttle:{scope}:{ident}'
+# Корзина без пополнения (rate = 0) снова наполняется целиком через
+# столько секунд после первого запроса.
+NO_REFILL_PERIOD = 60 * 60
+
+
+def get_client_idents(request):
+    """
+    Корзины клиента: пользователя и его IP-адреса.
+
+    Корзина IP-адреса есть у каждого запроса, поэтому несколько
+    аккаунтов с одного адреса не получают лимит каждый.
+    """
+    idents = [f'ip:{request.META.get("REMOTE_ADDR")}']
+    if request.user.is_authenticated:
+        idents.insert(0, f'user:{request.user.pk}')
+    return idents
+
+
+class TokenBucket:
+
+    def __init__(self, key, capacity, rate, clock=time.time):
+        self.key = key
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def consume(self):
+        """
+        Забирает жетон из корзины.
+
+        Возвращает 0, если жетон выдан, иначе число секунд
+        до появления следующего жетона.
+        """
+        now = self.clock()
+        tokens, updated = self.cache.get(self.key, (self.capacity, now))
+        if not self.rate:
+            return self._consume_without_refill(tokens, updated, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        # Полная корзина ничем не отличается от отсутствующей.
+        timeout = math.ceil((self.capacity - tokens) / self.rate) or 1
+        self.cache.set(self.key, (tokens, now), timeout)
+        return wait
+
+    def _consume_without_refill(self, tokens, updated, now):
+        """
+        Выдаёт capacity жетонов за NO_REFILL_PERIOD секунд с первого запроса.
+
+        updated здесь - начало периода, оно не сдвигается.
+        """
+        if now - updated >= NO_REFILL_PERIOD:
+            tokens, updated = self.capacity, now
+        remaining = updated + NO_REFILL_PERIOD - now
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = remaining
+        self.cache.set(
+            self.key, (tokens, updated), math.ceil(remaining) or 1
+        )
+        return wait
+
+
+def throttle(request, scope, capacity, per_minute):
+    """
+    Число секунд, которое клиент должен подождать, или 0.
+
+    Жетон забирается из каждой корзины клиента по очереди; если
+    какая-то из них пуста, остальные не трогаются. Нулевая capacity
+    отключает ограничение.
+    """
+    if not capacity:
+        return 0
+    for ident in get_client_idents(request):
+        key = THROTTLE_KEY.format(scope=scope, ident=ident)
+        wait = TokenBucket(key, capacity, per_minute / 60).consume()
+        if wait:
+            return wait
+    return 0
@@ -1,16 +1,72 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import api_views, async_views, views
 
 app_name = 'news'
 
-urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
-    path(
-        'delete_comment/<int:pk>/',
-        views.CommentDelete.as_view(),
-        name='delete'
-    ),
-    path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
-]
+
+def get_urlpatterns(use_async_views=False):
+    """
+    Маршруты приложения.
+
+    С use_async_views главная страница и страница новости
+    обслуживаются асинхронными представлениями.
+    """
+    if use_async_views:
+        home = async_views.news_list
+        detail = async_views.news_detail
+    else:
+        home = views.NewsList.as_view()
+        detail = views.NewsDetailView.as_view()
+    return [
+        path('', home, name='home'),
+        path('news/<int:pk>/', detail, name='detail'),
+        path(
+            'news/<int:pk>/comments/',
+            views.NewsComments.as_view(),
+            name='comments'
+        ),
+        path(
+            'delete_comment/<int:pk>/',
+            views.CommentDelete.as_view(),
+            name='delete'
+        ),
+        path(
+            'edit_comment/<int:pk>/',
+            views.CommentUpdate.as_view(),
+            name='edit'
+        ),
+        path('archive/', views.NewsArchive.as_view(), name='archive'),
+        path(
+            'archive/<int:year>/',
+            views.NewsArchive.as_view(),
+            name='archive_year'
+        ),
+        path(
+            'archive/<int:year>/<int:month>/',
+            views.NewsArchive.as_view(),
+            name='archive_month'
+        ),
+        path('search/', views.NewsSearch.as_view(), name='search'),
+        path(
+            'api/search/',
+            views.NewsSearchApi.as_view(),
+            name='search_api'
+        ),
+        path('export/', views.Export.as_view(), name='export'),
+        path('api/news/', api_views.NewsFeedApi.as_view(), name='api_feed'),
+        path(
+            'api/news/<int:pk>/',
+            api_views.NewsDetailApi.as_view(),
+            name='api_detail'
+        ),
+        path(
+            'api/news/<int:pk>/comments/',
+            api_views.NewsCommentsApi.as_view(),
+            name='api_comments'
+        ),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.NEWS_ASYNC_VIEWS)
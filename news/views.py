@@ -1,11 +1,88 @@
+import math
+from datetime import date
+from functools import partial
+from itertools import groupby
+from operator import attrgetter
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.models import AnonymousUser
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import render
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.views import generic
 
-from .forms import CommentForm
-from .models import Comment, News
+from yanews.routers import read_from_primary
+
+from .cache import get_feed_page, get_feed_version, set_feed_page
+from .comment_queue import get_comment_queue
+from .conditional import (
+    conditional_response, feed_state, make_etag, news_state
+)
+from .exporters import export
+from .forms import CommentForm, ExportForm
+from .models import ArchiveMonth, Comment, News
+from .pagination import InvalidCursor, keyset_page
+from .search import search_news
+from .throttling import throttle
+
+COMMENTS_ORDERING = ('created', 'id')
+ARCHIVE_ORDERING = ('-date', '-id')
+# Колонки для списка комментариев: от автора нужны только id и имя,
+# хеш пароля и прочие поля пользователя не читаем.
+COMMENT_FIELDS = (
+    'id', 'text', 'created', 'updated_at', 'author', 'author__username',
+)
+
+
+def get_comments(news_id):
+    """Комментарии к новости вместе с именами авторов."""
+    return Comment.objects.filter(news_id=news_id).select_related(
+        'author'
+    ).only(*COMMENT_FIELDS)
+
+
+def get_comment_page(news_id, cursor=None):
+    """Страница комментариев к новости и курсор следующей страницы."""
+    return keyset_page(
+        get_comments(news_id),
+        COMMENTS_ORDERING,
+        settings.COMMENTS_PAGE_SIZE,
+        cursor,
+    )
+
+
+def skip_session(request):
+    """
+    Подставляет анонимного пользователя в запрос без cookie сессии.
+
+    Такой пользователь точно не вошёл, и сессию читать не нужно. Раз
+    она не прочитана, SessionMiddleware не добавит к ответу
+    Vary: Cookie, и страницу может хранить общий кеш.
+    Возвращает True, если запрос анонимный.
+    """
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    request.user = AnonymousUser()
+    return True
+
+
+def patch_detail_cache_control(response, anonymous):
+    """
+    Разрешает хранить анонимную страницу новости в общих кешах.
+
+    Страницу для вошедшего пользователя хранит только его браузер.
+    """
+    if anonymous:
+        patch_cache_control(
+            response, public=True, max_age=settings.NEWS_DETAIL_MAX_AGE
+        )
+    else:
+        patch_cache_control(response, private=True)
 
 
 class NewsList(generic.ListView):
@@ -20,21 +97,70 @@ class NewsList(generic.ListView):
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.feed()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Отвечаем 304, если у клиента актуальная версия ленты.
+
+        Анонимным пользователям отдаём заранее отрисованную ленту вместе
+        с её ETag, так что повторный визит вообще не обращается к базе.
+        Страница кешируется под текущей версией ленты, поэтому после
+        любого изменения новостей или комментариев она отрисуется заново.
+        """
+        render = partial(super().get, request, *args, **kwargs)
+        news_count = settings.NEWS_COUNT_ON_HOME_PAGE
+        if request.user.is_authenticated:
+            etag, last_modified = feed_state(news_count)
+            return conditional_response(
+                request, make_etag(etag, request.user.pk), last_modified,
+                render,
+            )
+        version = get_feed_version()
+        page = get_feed_page(version)
+        if page is not None:
+            return conditional_response(
+                request, page['etag'], page['last_modified'],
+                partial(HttpResponse, page['content']),
+            )
+        # Ленту для кеша читаем из основной базы и отрисовываем сразу:
+        # отставшая реплика сохранила бы старую ленту под новой версией.
+        with read_from_primary():
+            etag, last_modified = feed_state(news_count)
+            response = conditional_response(
+                request, etag, last_modified, render
+            )
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(
+                    lambda rendered: set_feed_page(version, {
+                        'content': rendered.content,
+                        'etag': etag,
+                        'last_modified': last_modified,
+                    })
+                )
+                response.render()
+        return response
+
 
+class CommentPageMixin:
+    """Добавляет в контекст первую страницу комментариев к новости."""
 
-class NewsDetail(generic.DetailView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = get_comment_page(
+            self.object.pk
+        )
+        return context
+
+
+class NewsDetail(CommentPageMixin, generic.DetailView):
+    """Страница новости без формы комментария."""
     model = News
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+
+class NewsDetailWithForm(NewsDetail):
+    """Страница новости с формой комментария для вошедшего пользователя."""
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -43,8 +169,38 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class CommentThrottleMixin:
+    """
+    Ограничивает частоту POST-запросов от одного пользователя
+    и от одного IP-адреса.
+
+    Сверх лимита отвечает 429 с заголовком Retry-After,
+    не обращаясь к базе.
+    """
+    throttle_scope = 'comment'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            wait = throttle(
+                request,
+                self.throttle_scope,
+                settings.COMMENT_THROTTLE_BURST,
+                settings.COMMENT_THROTTLE_PER_MINUTE,
+            )
+            if wait:
+                response = HttpResponse(
+                    'Слишком много комментариев, попробуйте позже.',
+                    status=429,
+                )
+                response['Retry-After'] = math.ceil(wait)
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentThrottleMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -57,41 +213,204 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        """
+        Сохраняет комментарий.
+
+        В режиме COMMENT_WRITE_QUEUE комментарий только ставится
+        в очередь и появится на странице после записи пачки.
+        """
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if settings.COMMENT_WRITE_QUEUE:
+            get_comment_queue().put(comment)
+        else:
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        """
+        Отвечаем 304, если у клиента актуальная версия страницы.
+
+        Без cookie сессии отдаём страницу без формы и CSRF-токена,
+        не читая сессию: её могут хранить прокси и общие кеши.
+        """
+        anonymous = skip_session(request)
+        view = (NewsDetail if anonymous else NewsDetailWithForm).as_view()
+        etag, last_modified = news_state(kwargs['pk'])
+        if etag is not None:
+            etag = make_etag(etag, request.user.pk)
+        response = conditional_response(
+            request, etag, last_modified,
+            partial(view, request, *args, **kwargs),
+        )
+        patch_detail_cache_control(response, anonymous)
+        return response
 
     def post(self, request, *args, **kwargs):
         view = NewsComment.as_view()
         return view(request, *args, **kwargs)
 
 
+class NewsComments(generic.View):
+    """
+    Следующая страница комментариев для кнопки «Показать ещё».
+
+    По умолчанию отдаёт HTML-фрагмент, с параметром format=json - JSON.
+    """
+
+    def get(self, request, pk):
+        try:
+            comments, next_cursor = get_comment_page(
+                pk, request.GET.get('after')
+            )
+        except InvalidCursor:
+            return HttpResponseBadRequest()
+        # Непустая страница и так доказывает, что новость есть.
+        if not comments and not News.objects.filter(pk=pk).exists():
+            raise Http404
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.pk,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created': comment.created,
+                    }
+                    for comment in comments
+                ],
+                'next': next_cursor,
+            })
+        return render(request, 'includes/comments.html', {
+            'comments': comments,
+            'next_cursor': next_cursor,
+            'news_id': pk,
+        })
+
+
+def group_by_year(months):
+    """Месяцы архива по годам: [(год, новостей за год, месяцы), ...]."""
+    years = []
+    for year, group in groupby(months, attrgetter('year')):
+        group = list(group)
+        years.append((year, sum(item.news_count for item in group), group))
+    return years
+
+
+class NewsArchive(generic.TemplateView):
+    """
+    Архив новостей: вся лента или новости за год или месяц.
+
+    Страницы листаются курсором по (date, id), поэтому любая страница
+    стоит столько же, сколько первая. Число новостей по месяцам берётся
+    из сводной таблицы ArchiveMonth, а не считается по новостям.
+    """
+    template_name = 'news/archive.html'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except InvalidCursor:
+            return HttpResponseBadRequest('Некорректный курсор.')
+
+    def get_period(self, year=None, month=None):
+        """Границы периода [начало, конец) или (None, None)."""
+        if year is None:
+            return None, None
+        try:
+            if month is None:
+                return date(year, 1, 1), date(year + 1, 1, 1)
+            start = date(year, month, 1)
+        except ValueError:
+            raise Http404('Нет такого месяца.')
+        if month == 12:
+            return start, date(year + 1, 1, 1)
+        return start, date(year, month + 1, 1)
+
+    def get_context_data(self, year=None, month=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start, end = self.get_period(year, month)
+        queryset = News.objects.feed()
+        if start is not None:
+            queryset = queryset.filter(date__gte=start, date__lt=end)
+        context['news_feed'], context['next_cursor'] = keyset_page(
+            queryset,
+            ARCHIVE_ORDERING,
+            settings.ARCHIVE_PAGE_SIZE,
+            self.request.GET.get('after'),
+        )
+        context['years'] = group_by_year(
+            ArchiveMonth.objects.filter(news_count__gt=0)
+        )
+        context['year'], context['month'] = year, month
+        context['period_start'] = start
+        return context
+
+
+class NewsSearch(generic.TemplateView):
+    """Поиск по заголовкам и текстам новостей."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['results'] = search_news(
+            query, settings.SEARCH_RESULTS_LIMIT
+        ) if query else []
+        return context
+
+
+class NewsSearchApi(generic.View):
+    """Поиск новостей в формате JSON."""
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        results = search_news(
+            query, settings.SEARCH_RESULTS_LIMIT
+        ) if query else []
+        return JsonResponse({
+            'query': query,
+            'results': [
+                {
+                    'id': news.pk,
+                    'title': news.title,
+                    'date': news.date,
+                    'snippet': news.snippet,
+                    'url': reverse('news:detail', args=(news.pk,)),
+                }
+                for news in results
+            ],
+        })
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Заголовок новости нужен в шаблонах, поэтому забираем её сразу.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -103,3 +422,36 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class Export(LoginRequiredMixin, UserPassesTestMixin, generic.View):
+    """
+    Потоковая выгрузка новостей или комментариев для сотрудников.
+
+    Ответ - файл .jsonl.gz или .csv.gz, который формируется по мере
+    отправки и не собирается в памяти целиком.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        form = ExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        params = form.cleaned_data
+        export_format = params['format'] or 'jsonl'
+        response = StreamingHttpResponse(
+            export(
+                params['kind'],
+                export_format,
+                date_from=params['date_from'],
+                date_to=params['date_to'],
+                since_id=params['since_id'],
+            ),
+            content_type='application/gzip',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{params["kind"]}.{export_format}.gz"'
+        )
+        return response
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+class YanewsConfig(AppConfig):
+    name = 'yanews'
+    verbose_name = 'YaNews'
+
+    def ready(self):
+        from .auth import forget_user
+        from .db import configure_sqlite
+        connection_created.connect(configure_sqlite)
+        post_save.connect(forget_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(forget_user, sender=settings.AUTH_USER_MODEL)
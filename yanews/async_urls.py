@@ -0,0 +1,4 @@
+"""Маршруты с асинхронными страницами чтения независимо от настроек."""
+from yanews.urls import get_urlpatterns
+
+urlpatterns = get_urlpatterns(use_async_views=True)
@@ -0,0 +1,40 @@
+"""
+Пользователь из кеша вместо запроса к auth_user в каждом запросе.
+
+AuthenticationMiddleware загружает пользователя сессии при каждом
+обращении к request.user. CachedModelBackend держит его в кеше
+USER_CACHE_ALIAS до USER_CACHE_TIMEOUT секунд; сохранение или
+удаление пользователя сбрасывает запись. Смена пароля тоже
+сохраняет пользователя, так что проверка хеша сессии видит новый пароль.
+
+Сброс идёт по сигналам модели, поэтому QuerySet.update() по
+пользователям кеш не сбрасывает: после такого обновления кеш нужно
+очистить вручную или дождаться истечения USER_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        cache = caches[settings.USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def forget_user(sender, instance, **kwargs):
+    """Убирает из кеша изменённого или удалённого пользователя."""
+    caches[settings.USER_CACHE_ALIAS].delete(user_cache_key(instance.pk))
@@ -0,0 +1,26 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite.
+
+    PRAGMA действуют только на текущее соединение (кроме journal_mode,
+    который сохраняется в файле базы), поэтому выполняются каждый раз.
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def copy_sqlite(source, target, pages=1024):
+    """
+    Копирует базу SQLite source в target через backup API.
+
+    source и target - соединения модуля sqlite3. Копирование идёт
+    порциями по pages страниц, так что запись в source блокируется
+    лишь ненадолго. Target заменяется целиком одной транзакцией:
+    читатели видят либо старую, либо новую копию.
+    """
+    source.backup(target, pages=pages)
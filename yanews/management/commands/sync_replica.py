@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from yanews.db import copy_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS. '
+        'Заменяет репликацию при локальной проверке чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Реплики для обновления, по умолчанию все.',
+        )
+        parser.add_argument('--pages', type=int, default=1024,
+                            help='Страниц базы за один шаг копирования.')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Реплики не настроены (SQLITE_REPLICAS).')
+        unknown = set(aliases) - set(settings.DATABASE_REPLICAS)
+        if unknown:
+            raise CommandError(f'Неизвестные реплики: {", ".join(unknown)}')
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in aliases:
+            target = connections[alias]
+            target.ensure_connection()
+            started = time.perf_counter()
+            try:
+                copy_sqlite(
+                    source.connection, target.connection, options['pages']
+                )
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(
+                f'{alias}: скопировано за '
+                f'{time.perf_counter() - started:.2f} с'
+            ))
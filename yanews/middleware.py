@@ -0,0 +1,229 @@
+import logging
+import mimetypes
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+from .routers import REPLICA_PIN_COOKIE, pin_to_primary, unpin
+
+logger = logging.getLogger('yanews.performance')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+# Эти типы уже сжаты, повторное сжатие их только увеличит.
+COMPRESSED_CONTENT_TYPES = (
+    'application/gzip', 'application/zip', 'image/', 'font/woff',
+)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class RequestStats:
+    """Счётчики одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper()."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class PerformanceMiddleware:
+    """
+    Замеряет стоимость каждого запроса.
+
+    Считает SQL-запросы и их суммарное время, время отрисовки шаблона
+    и общее время ответа. Результат уходит в заголовок Server-Timing
+    и в лог yanews.performance; запросы сверх бюджета PERF_QUERY_BUDGET
+    или PERF_TIME_BUDGET_MS пишутся в лог с уровнем WARNING.
+
+    Если PERF_INSTRUMENTATION выключен, middleware исключается
+    из цепочки при старте и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        request.performance_stats = stats
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(stats.record_query)
+                )
+            response = self.get_response(request)
+        total_time = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={stats.sql_time * 1000:.2f};'
+            f'desc="{stats.queries} queries"',
+            f'tpl;dur={stats.template_time * 1000:.2f}',
+            f'total;dur={total_time * 1000:.2f}',
+        ))
+        self.log(request, response, stats, total_time)
+        return response
+
+    def process_template_response(self, request, response):
+        """Засекает время от этой точки до окончания отрисовки шаблона."""
+        started = time.perf_counter()
+
+        def stop_timer(rendered):
+            request.performance_stats.template_time += (
+                time.perf_counter() - started
+            )
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+    def log(self, request, response, stats, total_time):
+        over_budget = (
+            stats.queries > settings.PERF_QUERY_BUDGET
+            or total_time * 1000 > settings.PERF_TIME_BUDGET_MS
+        )
+        data = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'sql_ms': round(stats.sql_time * 1000, 2),
+            'template_ms': round(stats.template_time * 1000, 2),
+            'total_ms': round(total_time * 1000, 2),
+            'over_budget': over_budget,
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            ' '.join(f'{key}={value}' for key, value in data.items()),
+            extra={'performance': data},
+        )
+
+
+class ReplicaPinMiddleware:
+    """
+    Обеспечивает «чтение своих записей» при работе с репликами.
+
+    Запрос, изменяющий данные, целиком читает из основной базы и
+    ставит cookie, с которой следующие REPLICA_PIN_SECONDS секунд
+    клиент тоже читает из неё, пока реплики не догонят основную базу.
+
+    Без DATABASE_REPLICAS исключается из цепочки при старте.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        token = pin_to_primary(
+            writes or REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            unpin(token)
+        if writes:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware с порогом GZIP_MIN_LENGTH.
+
+    Короткие ответы сжатие почти не уменьшает, а время на него
+    тратится. Уже сжатые форматы, например выгрузки .gz,
+    отдаются как есть.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith(
+            COMPRESSED_CONTENT_TYPES
+        ):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.GZIP_MIN_LENGTH
+        ):
+            return response
+        return super().process_response(request, response)
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Отдаёт собранную статику из STATIC_ROOT без веб-сервера.
+
+    Если клиент принимает gzip и collectstatic положил рядом сжатую
+    копию name.gz, отдаётся она: сжимать на каждый запрос не нужно.
+    Файлы с хешем содержимого в имени не меняются, поэтому браузер
+    может хранить их год.
+
+    Без STATIC_SERVE исключается из цепочки при старте.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.immutable = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(
+            settings.STATIC_URL
+        ):
+            response = self.serve(
+                request, request.path[len(settings.STATIC_URL):]
+            )
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        compressed = f'{path}.gz'
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        use_gzip = bool(
+            re_accepts_gzip.search(accept) and os.path.isfile(compressed)
+        )
+        response = FileResponse(
+            open(compressed if use_gzip else path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if name in self.immutable:
+            response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
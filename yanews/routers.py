@@ -0,0 +1,73 @@
+"""
+Чтение с реплик, запись в основную базу.
+
+Реплики перечислены в DATABASE_REPLICAS. Чтение уходит на случайную
+реплику, кроме случаев, когда реплика может отставать от того, что
+пользователь только что записал сам:
+
+- запрос изменяет данные (POST и т.п.) - все чтения в нём идут
+  в основную базу;
+- после такого запроса клиент ещё REPLICA_PIN_SECONDS секунд несёт
+  cookie REPLICA_PIN_COOKIE и тоже читает из основной базы;
+- открыта транзакция в основной базе.
+
+Привязку к основной базе выставляет ReplicaPinMiddleware.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+def pin_to_primary(pinned=True):
+    """Привязывает чтения текущего запроса к основной базе."""
+    return _pinned.set(pinned)
+
+
+def unpin(token):
+    _pinned.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Чтения внутри блока идут в основную базу.
+
+    Нужно, когда прочитанное переживёт запрос, например попадёт в кеш:
+    отставшая реплика иначе сохранила бы туда старые данные.
+    """
+    token = pin_to_primary()
+    try:
+        yield
+    finally:
+        unpin(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """На репликах те же данные, что в основной базе."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Схема реплик приходит вместе с копией основной базы."""
+        return db not in settings.DATABASE_REPLICAS
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -17,10 +18,15 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yanews.apps.YanewsConfig',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
+    'yanews.middleware.PerformanceMiddleware',
+    'yanews.middleware.PrecompressedStaticMiddleware',
+    'yanews.middleware.ThresholdGZipMiddleware',
+    'yanews.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -32,12 +38,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yanews.urls'
 
+# Шаблоны читаются и компилируются один раз на процесс (cached loader),
+# если не включена отладка. TEMPLATES_CACHED=1 или 0 задаёт это явно.
+TEMPLATES_CACHED = os.getenv('TEMPLATES_CACHED', '0' if DEBUG else '1') == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATES_CACHED:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -51,13 +69,108 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# Профиль SQLite для боевой нагрузки: WAL, постоянные соединения
+# и ожидание блокировки вместо ошибки «database is locked».
+# Включается переменной окружения SQLITE_TUNED=1, отдельные параметры
+# переопределяются переменными SQLITE_*.
+SQLITE_TUNED = os.getenv('SQLITE_TUNED', '') == '1'
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Отрицательное значение - размер в килобайтах, а не в страницах.
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),
+    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+} if SQLITE_TUNED else {}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_NAME', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(
+            os.getenv('DB_CONN_MAX_AGE', 600 if SQLITE_TUNED else 0)
+        ),
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
     }
 }
 
+# Реплики только для чтения: пути к копиям базы через запятую.
+# Копии обновляет команда sync_replica. В тестах реплики смотрят
+# в основную базу.
+SQLITE_REPLICAS = [
+    name for name in os.getenv('SQLITE_REPLICAS', '').split(',') if name
+]
+DATABASE_REPLICAS = []
+for index, name in enumerate(SQLITE_REPLICAS):
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['yanews.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache'))
+
+# Для file-бэкенда LOCATION - каталог, общий для всех процессов.
+# Фрагменты шаблонов ({% cache %}) лежат отдельно: их много, а ключи
+# включают время изменения записи, так что устаревшие просто вытесняются.
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': CACHE_LOCATION,
+    },
+    'template_fragments': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.path.join(CACHE_LOCATION, 'fragments'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'sessions': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.path.join(CACHE_LOCATION, 'sessions'),
+    },
+}
+
+# Где хранятся сессии: db - только в базе; cached_db - в кеше
+# 'sessions' с записью в базу; signed_cookies - в подписанной cookie,
+# без обращений к базе и кешу. С locmem кеш у каждого процесса свой:
+# для cached_db в нескольких процессах нужен CACHE_BACKEND=file,
+# иначе выход из системы виден только процессу, который его обработал.
+# Подписанную cookie нельзя отозвать на сервере до истечения
+# срока, но смена пароля по-прежнему завершает все сессии.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'db')
+SESSION_ENGINE = SESSION_BACKENDS[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Пользователь сессии берётся из кеша (yanews.auth), а не из базы
+# в каждом запросе. Нулевой USER_CACHE_TIMEOUT отключает кеш.
+# Изменённый пользователь удаляется только из кеша процесса, который
+# его сохранил, поэтому по умолчанию кеш включён лишь для общего
+# CACHE_BACKEND=file: с locmem другие процессы ещё USER_CACHE_TIMEOUT
+# секунд видели бы старый пароль и is_active.
+AUTHENTICATION_BACKENDS = ['yanews.auth.CachedModelBackend']
+USER_CACHE_ALIAS = 'sessions'
+USER_CACHE_TIMEOUT = int(os.getenv(
+    'USER_CACHE_TIMEOUT', 0 if CACHE_BACKEND == 'locmem' else 60 * 5
+))
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -73,6 +186,24 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# collectstatic добавляет к именам файлов хеш содержимого и кладёт
+# рядом сжатые копии (yanews.storage). По умолчанию - без отладки:
+# с этим хранилищем {% static %} работает только после collectstatic.
+STATIC_MANIFEST = os.getenv('STATIC_MANIFEST', '0' if DEBUG else '1') == '1'
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = (
+        'yanews.storage.CompressedManifestStaticFilesStorage'
+    )
+STATIC_GZIP_MIN_LENGTH = 256
+# Отдавать собранную статику самим приложением, если перед ним
+# нет веб-сервера (yanews.middleware.PrecompressedStaticMiddleware).
+STATIC_SERVE = os.getenv('STATIC_SERVE', '') == '1'
+
+# Ответы короче порога не сжимаются. CSRF-токен в HTML маскируется
+# заново в каждом ответе, поэтому сжатие не открывает его для BREACH.
+GZIP_MIN_LENGTH = 1024
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -80,3 +211,69 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+# Обслуживать главную страницу и страницу новости асинхронными
+# представлениями (news.async_views). Имеет смысл только под ASGI.
+NEWS_ASYNC_VIEWS = os.getenv('NEWS_ASYNC_VIEWS', '') == '1'
+
+COMMENTS_PAGE_SIZE = 50
+
+# Сколько секунд браузер и прокси хранят страницу новости для
+# анонимного пользователя, не перепроверяя её по ETag.
+NEWS_DETAIL_MAX_AGE = 60
+
+ARCHIVE_PAGE_SIZE = 20
+
+SEARCH_RESULTS_LIMIT = 20
+
+# JSON API (news.api_views): размер страницы ленты и порог,
+# начиная с которого ответ сжимается gzip.
+API_PAGE_SIZE = 50
+API_GZIP_MIN_LENGTH = 200
+
+# Не больше COMMENT_THROTTLE_BURST комментариев подряд, дальше -
+# COMMENT_THROTTLE_PER_MINUTE в минуту от одного пользователя и от одного IP.
+# Нулевой COMMENT_THROTTLE_BURST отключает ограничение, а нулевой
+# COMMENT_THROTTLE_PER_MINUTE оставляет COMMENT_THROTTLE_BURST
+# комментариев в час (news.throttling.NO_REFILL_PERIOD).
+COMMENT_THROTTLE_BURST = int(os.getenv('COMMENT_THROTTLE_BURST', 5))
+COMMENT_THROTTLE_PER_MINUTE = int(os.getenv('COMMENT_THROTTLE_PER_MINUTE', 10))
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Записывать новые комментарии пачками из фонового потока
+# (news.comment_queue) вместо сохранения в каждом запросе.
+COMMENT_WRITE_QUEUE = os.getenv('COMMENT_WRITE_QUEUE', '') == '1'
+COMMENT_QUEUE_BATCH_SIZE = 100
+COMMENT_QUEUE_INTERVAL = 0.5
+
+# Кеш отрисованной главной страницы для анонимных пользователей.
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = 60 * 15
+
+# Файл со списком запрещённых слов, по одному в строке.
+# Изменения подхватываются без перезапуска. Если не задан,
+# используется news.forms.BAD_WORDS.
+BAD_WORDS_FILE = os.getenv('BAD_WORDS_FILE')
+# Как часто (в секундах) проверять, не изменился ли этот файл.
+BAD_WORDS_CHECK_INTERVAL = 5
+
+# Замеры SQL и времени ответа для каждого запроса (yanews.middleware).
+PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', '') == '1'
+PERF_QUERY_BUDGET = int(os.getenv('PERF_QUERY_BUDGET', 20))
+PERF_TIME_BUDGET_MS = int(os.getenv('PERF_TIME_BUDGET_MS', 200))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yanews.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
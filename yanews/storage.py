@@ -0,0 +1,50 @@
+"""
+Хранилище статики с отпечатками в именах и заранее сжатыми копиями.
+
+collectstatic, как и ManifestStaticFilesStorage, кладёт рядом с каждым
+файлом копию с хешем содержимого в имени, а для текстовых файлов ещё
+и её сжатую версию name.gz. Сжатие идёт один раз при сборке с
+максимальным уровнем, а не на каждый запрос; отдаёт сжатые копии
+PrecompressedStaticMiddleware или веб-сервер (gzip_static в nginx).
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.json', '.svg', '.txt', '.html', '.xml', '.map',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if self.compress(name):
+                yield name, f'{name}.gz', True
+
+    def compress(self, name):
+        """
+        Сохраняет name.gz, если файл текстовый, не меньше порога
+        STATIC_GZIP_MIN_LENGTH и сжатие действительно его уменьшает.
+        """
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return False
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < settings.STATIC_GZIP_MIN_LENGTH:
+            return False
+        # mtime=0: одинаковый файл даёт одинаковый архив при каждой сборке.
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return False
+        gz_name = f'{name}.gz'
+        if self.exists(gz_name):
+            self.delete(gz_name)
+        self.save(gz_name, ContentFile(compressed))
+        return True
@@ -0,0 +1,23 @@
+"""
+Настройки для тестов.
+
+Всё то же, что в yanews.settings, кроме того, что только замедляет
+прогон и не влияет на проверяемое поведение.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import (
+    SESSION_BACKENDS, TEMPLATE_LOADERS, TEMPLATES, TEMPLATES_CACHED
+)
+
+# Стойкое хеширование паролей намеренно медленное.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Шаблоны компилируются один раз на процесс, а не в каждом тесте.
+if not TEMPLATES_CACHED:
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
+# Число запросов в тестах считается для сессий в базе; остальные
+# хранилища сессий тесты включают сами.
+SESSION_ENGINE = SESSION_BACKENDS['db']
@@ -1,13 +1,11 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
-urlpatterns = [
-    path('', include('news.urls')),
-    path('admin/', admin.site.urls),
-]
+from news.urls import get_urlpatterns as get_news_urlpatterns
 
 auth_urls = ([
     path(
@@ -33,4 +31,14 @@ auth_urls = ([
     ),
 ], 'users')
 
-urlpatterns += [path('auth/', include(auth_urls))]
+
+def get_urlpatterns(use_async_views=False):
+    """Маршруты проекта, с асинхронными страницами при необходимости."""
+    return [
+        path('', include((get_news_urlpatterns(use_async_views), 'news'))),
+        path('admin/', admin.site.urls),
+        path('auth/', include(auth_urls)),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.NEWS_ASYNC_VIEWS)